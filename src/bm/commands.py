@@ -1,6 +1,5 @@
 """Command implementations for the bookmark manager."""
 
-import html
 import json
 import os
 import re
@@ -10,19 +9,33 @@ import tempfile
 import textwrap
 import webbrowser
 from datetime import datetime, timezone
+from html.parser import HTMLParser
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
-from .io import atomic_write, build_text, load_entry, parse_front_matter
+from .index import IndexEntry, find_by_id, iter_index
+from .io import (
+    atomic_write,
+    build_text,
+    load_body,
+    load_entry,
+    map_io,
+    parse_front_matter,
+    walk_store,
+    write_new,
+)
 from .models import DEFAULT_STORE, FILE_EXT
 from .utils import (
     _launch_editor,
     _reject_unsafe,
+    _strip_leading_www,
     create_slug_from_url,
     die,
     id_to_path,
     iso_now,
+    meta_epoch,
     normalize_slug,
     normalize_url_for_compare,
     parse_iso,
@@ -34,6 +47,10 @@ ALLOWED_URL_SCHEMES = frozenset({"http", "https", "ftp", "ftps", "mailto"})
 
 _PROGRESS_EVERY = 500
 
+# json.dumps() builds a fresh JSONEncoder on every call whenever a non-default
+# option such as ensure_ascii=False is passed; JSONL output calls it per row.
+_to_json = json.JSONEncoder(ensure_ascii=False).encode
+
 
 def _progress_tick(label: str, count: int) -> None:
     """Emit a TTY-only progress line on stderr every _PROGRESS_EVERY items."""
@@ -174,7 +191,7 @@ def cmd_open(args) -> None:
     p = resolve_id_or_path(store, args.id)
     if not p:
         die("not found")
-    meta, _ = load_entry(p)
+    meta, _ = load_entry(p, meta_only=True)
     url = meta.get("url")
     if not url:
         die("no url in entry")
@@ -187,48 +204,52 @@ def cmd_open(args) -> None:
         print("bm: warning: system did not acknowledge opening browser", file=sys.stderr)
 
 
-def _iter_entries(
-    store: Path, meta_only: bool = False
-) -> Generator[Tuple[Path, Path, Dict[str, Any], str], None, None]:
-    """Iterate over all entries. If meta_only, skip body parsing.
+def _load_full(path: str) -> Tuple[Optional[Tuple[Dict[str, Any], str]], Optional[Exception]]:
+    try:
+        return load_entry(Path(path)), None
+    except (OSError, ValueError, UnicodeError) as exc:
+        return None, exc
+
+
+def _iter_entries(store: Path) -> Generator[Tuple[str, str, Dict[str, Any], str], None, None]:
+    """Iterate over all entries, bodies included, as `(path, rel, meta, body)`.
 
-    Files that fail to load (OSError, decode errors, malformed front matter)
-    are skipped with a stderr warning rather than aborting the iteration.
+    `path` and `rel` are plain strings, as in `IndexEntry`; callers build a
+    `Path` only for the files they act on. Files are read on a thread pool
+    when there are many, and yielded in walk order. Metadata-only walks
+    should use `iter_index`, which serves cached front matter. Files that
+    fail to load (OSError, decode errors, malformed front matter) are
+    skipped with a stderr warning rather than aborting the iteration.
     """
-    for p in store.rglob(f"*{FILE_EXT}"):
-        rel = p.relative_to(store).with_suffix("")
-        try:
-            meta, body = load_entry(p, meta_only=meta_only)
-        except (OSError, ValueError, UnicodeError) as exc:
-            print(f"bm: skipping {rel}: {exc}", file=sys.stderr)
+    found = list(walk_store(store))
+    loaded = map_io(_load_full, [dirent.path for dirent, _ in found])
+    for (dirent, key), (entry, exc) in zip(found, loaded):
+        if entry is None:
+            print(f"bm: skipping {key}: {exc}", file=sys.stderr)
             continue
-        yield p, rel, meta, body
+        meta, body = entry
+        yield dirent.path, key, meta, body
 
 
-def _matches_tag(rel, meta, tag):
+def _matches_tag(tagset, tag):
     if not tag:
         return True
-    return tag in rel.parts[:-1] or tag in meta.get("tags", [])
+    return tag in tagset
 
 
-def _matches_host(meta, want_host):
+def _matches_host(entry_host, want_host):
     if not want_host:
         return True
-    host = urlparse(meta.get("url", "")).netloc.lower()
-    if host.startswith("www."):
-        host = host[4:]
-    hq = want_host[4:] if want_host.startswith("www.") else want_host
-    return host == hq
+    return entry_host == want_host
 
 
-def _matches_since(meta, since_dt):
-    if not since_dt:
+def _matches_since(entry_ts, since_ts):
+    if since_ts is None:
         return True
-    ts = parse_iso(meta.get("created")) or parse_iso(meta.get("modified"))
-    return bool(ts and ts >= since_dt)
+    return entry_ts is not None and entry_ts >= since_ts
 
 
-def _matches_path(rel, path_prefix):
+def _matches_path(rel: str, path_prefix):
     if not path_prefix:
         return True
     # Normalize path prefix (remove leading/trailing slashes)
@@ -236,8 +257,7 @@ def _matches_path(rel, path_prefix):
     if not path_prefix:
         return True
     # Check if relative path starts with the prefix
-    rel_str = str(rel)
-    return rel_str.startswith(path_prefix + "/") or rel_str == path_prefix
+    return rel.startswith(path_prefix + "/") or rel == path_prefix
 
 
 def _normalize_path_arg(value: Any) -> str:
@@ -247,29 +267,59 @@ def _normalize_path_arg(value: Any) -> str:
     return ""
 
 
-def _resolve_filter_args(args) -> Tuple[Optional[str], str, str, Optional[datetime]]:
-    """Extract the standard (tag, host, path, since_dt) filter tuple from args.
+def _resolve_filter_args(args) -> Tuple[Optional[str], str, str, Optional[int]]:
+    """Extract the standard (tag, host, path, since_ts) filter tuple from args.
+
+    `since_ts` is in epoch seconds, matching the timestamps stored in the index.
 
-    Only string values are honored — non-string sentinels (e.g. MagicMock from
-    tests) collapse to "no filter" instead of raising at compare time.
+    Subcommands that lack a flag (no attribute on `args`) get "no filter"
+    for it, as do `None`, empty strings and other non-string values.
     """
     tag_raw = getattr(args, "tag", None)
     tag = tag_raw if isinstance(tag_raw, str) and tag_raw else None
     host_raw = getattr(args, "host", None)
-    host = host_raw.lower() if isinstance(host_raw, str) else ""
+    host = _strip_leading_www(host_raw.lower()) if isinstance(host_raw, str) else ""
     path = _normalize_path_arg(getattr(args, "path", None))
     since_raw = getattr(args, "since", None)
     since_dt = parse_iso(since_raw) if isinstance(since_raw, str) and since_raw else None
-    return tag, host, path, since_dt
+    return tag, host, path, to_epoch(since_dt)
 
 
-def _passes_filters(rel, meta, tag, host, path, since_dt) -> bool:
-    return (
-        _matches_tag(rel, meta, tag)
-        and _matches_host(meta, host)
-        and _matches_path(rel, path)
-        and _matches_since(meta, since_dt)
-    )
+def _compile_filters(tag, host, path, since_ts) -> Optional[Callable[[IndexEntry], bool]]:
+    """Build one predicate from the active filters, or None when none are set.
+
+    Inactive filters are dropped up front and the rest run cheapest first:
+    precomputed host and timestamp compares, then the path prefix, then the
+    tag test (which builds the entry's tag set on first use).
+    """
+    checks: List[Callable[[IndexEntry], bool]] = []
+    if host:
+        checks.append(lambda e: _matches_host(e.host, host))
+    if since_ts is not None:
+        checks.append(lambda e: _matches_since(e.ts, since_ts))
+    if path and path.strip("/"):
+        checks.append(lambda e: _matches_path(e.rel, path))
+    if tag:
+        checks.append(lambda e: _matches_tag(e.tagset, tag))
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def match_all(e: IndexEntry) -> bool:
+        for check in checks:
+            if not check(e):
+                return False
+        return True
+
+    return match_all
+
+
+def _iter_filtered(store: Path, args) -> Iterator[IndexEntry]:
+    """Yield index entries that pass the standard filters in `args`."""
+    pred = _compile_filters(*_resolve_filter_args(args))
+    entries = iter_index(store)
+    return entries if pred is None else filter(pred, entries)
 
 
 def _entry_score(entry: Dict[str, Any]) -> Tuple[int, int, float, str]:
@@ -286,9 +336,18 @@ def _select_survivor(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
     return min(entries, key=_entry_score)
 
 
+def _is_empty_dir(d: Path) -> bool:
+    """True if `d` exists and has no entries; stops at the first dirent."""
+    try:
+        with os.scandir(d) as it:
+            return next(it, None) is None
+    except FileNotFoundError:
+        return False
+
+
 def _prune_empty_dirs(store: Path, start: Path) -> None:
     cur = start
-    while cur != store and cur.exists() and not any(cur.iterdir()):
+    while cur != store and _is_empty_dir(cur):
         cur.rmdir()
         cur = cur.parent
 
@@ -328,7 +387,7 @@ def _collect_group_stats(
     for entry in entries:
         meta = entry["meta"]
         tags_union.update(t.strip() for t in meta.get("tags", []) if t.strip())
-        tags_union.update(seg for seg in entry["rel"].parts[:-1] if seg)
+        tags_union.update(seg for seg in entry["rel"].split("/")[:-1] if seg)
 
         title = meta.get("title", "").strip()
         if title:
@@ -373,8 +432,8 @@ def _merge_entry_group(
     tags_union, earliest_created, latest_modified, title_candidates = _collect_group_stats(entries)
 
     if title_candidates and not merged_meta.get("title"):
-        title_candidates.sort(key=len, reverse=True)
-        merged_meta["title"] = title_candidates[0]
+        # Longest title wins; ties go to the earliest entry, as a stable sort would.
+        merged_meta["title"] = max(title_candidates, key=len)
 
     if earliest_created:
         merged_meta["created"] = earliest_created.isoformat()
@@ -389,45 +448,57 @@ def _merge_entry_group(
     return merged_meta, merged_body, tags, notes_appended, earliest_created, latest_modified
 
 
-def _build_row(rel, meta, ts):
-    url = meta.get("url", "")
+def _build_row(entry: IndexEntry):
+    meta = entry.meta
     return {
-        "id": rid(url),
-        "path": str(rel),
+        "id": entry.id,
+        "path": entry.rel,
         "title": meta.get("title", ""),
-        "url": url,
+        "url": meta.get("url", ""),
         "tags": meta.get("tags", []),
         "created": meta.get("created", ""),
         "modified": meta.get("modified", ""),
-        "_sort": ts or datetime.min.replace(tzinfo=timezone.utc),
     }
 
 
+def _newest_first(entries: List[IndexEntry]) -> List[IndexEntry]:
+    """Sort entries by timestamp, newest first; undated entries go last.
+
+    Dated entries are sorted on their epoch ints via `attrgetter`, with no
+    per-row key lambda or float sentinel; undated ones keep walk order.
+    """
+    dated = [e for e in entries if e.ts is not None]
+    dated.sort(key=attrgetter("ts"), reverse=True)
+    if len(dated) != len(entries):
+        dated.extend(e for e in entries if e.ts is None)
+    return dated
+
+
 def _collect_rows(store: Path, args) -> List[dict]:
-    rows = []
-    tag, host, path, since_dt = _resolve_filter_args(args)
-    for _, rel, meta, _ in _iter_entries(store, meta_only=True):
-        if not _passes_filters(rel, meta, tag, host, path, since_dt):
-            continue
-        ts = parse_iso(meta.get("created")) or parse_iso(meta.get("modified"))
-        rows.append(_build_row(rel, meta, ts))
-    rows.sort(key=lambda r: r["_sort"], reverse=True)
-    for r in rows:
-        r.pop("_sort", None)
-    return rows
+    # Sort the index entries themselves and build output rows afterwards, so
+    # row dicts carry no sort-only field that must be stripped again.
+    return [_build_row(entry) for entry in _newest_first(list(_iter_filtered(store, args)))]
+
+
+def _format_row(r: dict) -> str:
+    t = f" — {r['title']}" if r["title"] else ""
+    u = f" <{r['url']}>" if r["url"] else ""
+    return f"{r['id']}  {r['path']}{t}{u}"
+
+
+def _write_lines(lines: List[str]) -> None:
+    """Write `lines` newline-terminated with a single stdout call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _output_rows(rows: List[dict], args):
     if args.json:
-        print(json.dumps(rows, ensure_ascii=False))
+        _write_lines([_to_json(rows)])
     elif args.jsonl:
-        for r in rows:
-            print(json.dumps(r, ensure_ascii=False))
+        _write_lines([_to_json(r) for r in rows])
     else:
-        for r in rows:
-            t = f" — {r['title']}" if r["title"] else ""
-            u = f" <{r['url']}>" if r["url"] else ""
-            print(f"{r['id']}  {r['path']}{t}{u}")
+        _write_lines([_format_row(r) for r in rows])
 
 
 def cmd_list(args) -> None:
@@ -464,8 +535,41 @@ def _make_search_predicate(query: str, use_regex: bool):
         except re.error as exc:
             die(f"invalid --regex pattern: {exc}", code=2)
         return lambda blob: bool(pattern.search(blob))
-    terms = query.lower().split()
-    return lambda blob: all(term in blob for term in terms)
+    return _compile_terms(query.lower().split())
+
+
+def _compile_terms(terms: List[str]):
+    """Build a substring-AND predicate over `terms`, doing as few scans as possible.
+
+    Duplicates and terms contained in another term are dropped (matching the
+    longer one implies the shorter), and longer terms are tried first since
+    they are usually the most selective.
+    """
+    unique = sorted(set(terms), key=len, reverse=True)
+    needed = [t for i, t in enumerate(unique) if not any(t in o for o in unique[:i])]
+    if not needed:
+        return lambda blob: True
+    if len(needed) == 1:
+        term = needed[0]
+        return lambda blob: term in blob
+    needed_terms = tuple(needed)
+
+    def match_all(blob: str) -> bool:
+        # Plain loop: no generator frame per blob, unlike all(<genexpr>).
+        for term in needed_terms:
+            if term not in blob:
+                return False
+        return True
+
+    return match_all
+
+
+def _read_body(p: str) -> Optional[str]:
+    """Return the body of `p`, or None when it can no longer be read."""
+    try:
+        return load_body(Path(p))
+    except (OSError, ValueError, UnicodeError):
+        return None
 
 
 def cmd_search(args) -> None:
@@ -479,31 +583,38 @@ def cmd_search(args) -> None:
     )
     use_regex = getattr(args, "regex", False) is True
     matches = _make_search_predicate(args.query, use_regex)
-    tag, host, path, since_dt = _resolve_filter_args(args)
     needs_body = "body" in fields
+    # Filter on cached front matter first so only surviving entries pay for
+    # a body read (and only when body is in scope).
+    candidates = list(_iter_filtered(store, args))
+    if needs_body and not use_regex:
+        # Substring terms never contain whitespace, so a match within the
+        # header fields alone also matches the full blob; skip those bodies.
+        head_fields = tuple(f for f in fields if f != "body")
+        head_hits = [
+            matches(_build_search_blob(e.meta, "", head_fields).lower()) for e in candidates
+        ]
+    else:
+        head_hits = [False] * len(candidates)
+    to_read = [e.path for e, hit in zip(candidates, head_hits) if not hit] if needs_body else []
+    bodies = iter(map_io(_read_body, to_read))
     hits = []
-    # First pass uses meta_only so only entries that pass the meta filters pay
-    # for a full body read (and only when body is in scope).
-    for p, rel, meta, _ in _iter_entries(store, meta_only=True):
-        if not _passes_filters(rel, meta, tag, host, path, since_dt):
-            continue
-        body = ""
-        if needs_body:
-            try:
-                _, body = load_entry(p)
-            except (OSError, ValueError, UnicodeError):
-                continue
-        blob = _build_search_blob(meta, body, fields)
-        if not use_regex:
-            blob = blob.lower()
-        if matches(blob):
-            ts = parse_iso(meta.get("created")) or parse_iso(meta.get("modified"))
-            hits.append(_build_row(rel, meta, ts))
-    hits.sort(key=lambda r: r["_sort"], reverse=True)
-    for r in hits:
-        r.pop("_sort", None)
-
-    _output_rows(hits, args)
+    for entry, hit in zip(candidates, head_hits):
+        if not hit:
+            body = ""
+            if needs_body:
+                body = next(bodies)
+                if body is None:
+                    continue
+            blob = _build_search_blob(entry.meta, body, fields)
+            if not use_regex:
+                blob = blob.lower()
+            hit = matches(blob)
+        if hit:
+            hits.append(entry)
+    rows = [_build_row(entry) for entry in _newest_first(hits)]
+
+    _output_rows(rows, args)
     if not hits:
         sys.exit(1)
 
@@ -558,31 +669,33 @@ def cmd_mv(args) -> None:
 def cmd_tags(args) -> None:
     """List all tags."""
     store = Path(args.store or DEFAULT_STORE)
-    folder_tags = set()
-    header_tags = set()
-    for _, rel, meta, _ in _iter_entries(store, meta_only=True):
-        folder_tags.update(rel.parts[:-1])
-        header_tags.update(t.strip() for t in meta.get("tags", []) if t.strip())
-    all_tags = sorted(folder_tags | header_tags)
-    for t in all_tags:
-        print(t)
+    tags: Set[str] = set()
+    folders: Set[str] = set()
+    # Header tags come pre-split and stripped from the index; folder segments
+    # are collected per distinct directory rather than per entry.
+    for entry in iter_index(store):
+        tags.update(entry.meta.get("tags", ()))
+        folders.add(entry.rel.rpartition("/")[0])
+    for folder in folders:
+        if folder:
+            tags.update(folder.split("/"))
+    _write_lines(sorted(tags))
 
 
 def cmd_dirs(args) -> None:
     """List known directory prefixes."""
     store = Path(args.store or DEFAULT_STORE)
     dirs = set()
-    for _, rel, _, _ in _iter_entries(store, meta_only=True):
+    for entry in iter_index(store):
         # Add all parent directories
-        parts = rel.parts
+        parts = entry.rel.split("/")
         for i in range(1, len(parts)):
             dirs.add("/".join(parts[:i]))
     all_dirs = sorted(dirs)
     if args.json:
-        print(json.dumps(all_dirs, ensure_ascii=False))
+        _write_lines([_to_json(all_dirs)])
     else:
-        for d in all_dirs:
-            print(d)
+        _write_lines(all_dirs)
 
 
 def _group_entries_by_url(store: Path) -> Dict[str, List[Dict[str, Any]]]:
@@ -609,18 +722,19 @@ def _write_merged_entry(
     merged_meta_for_write["tags"] = tags
     if not merged_meta_for_write.get("modified"):
         merged_meta_for_write["modified"] = iso_now()
-    atomic_write(survivor["path"], build_text(merged_meta_for_write, merged_body))
+    atomic_write(Path(survivor["path"]), build_text(merged_meta_for_write, merged_body))
     survivor["meta"] = merged_meta_for_write
     survivor["body"] = merged_body
 
 
 def _remove_group_entries(store: Path, entries: List[Dict[str, Any]]) -> None:
     for entry in entries:
+        p = Path(entry["path"])
         try:
-            entry["path"].unlink()
+            p.unlink()
         except FileNotFoundError:
             continue
-        _prune_empty_dirs(store, entry["path"].parent)
+        _prune_empty_dirs(store, p.parent)
 
 
 def _process_duplicate_group(
@@ -675,7 +789,7 @@ def cmd_dedupe(args) -> None:
         actions.append(_process_duplicate_group(store, canonical, group, dry_run))
 
     if args.json:
-        print(json.dumps(actions, ensure_ascii=False))
+        print(_to_json(actions))
         return
 
     prefix = "DRY-RUN: " if dry_run else ""
@@ -720,37 +834,27 @@ NETSCAPE_HEADER = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
 """
 NETSCAPE_FOOTER = "</DL><p>\n"
 
-_RE_NETSCAPE_FOLDER = re.compile(r"<DT>\s*<H3\b[^>]*>(.*?)</H3>", re.I)
-_RE_NETSCAPE_BOOKMARK = re.compile(r"<DT>\s*<A\b[^>]*HREF=\"([^\"]+)\"[^>]*>(.*?)</A>", re.I)
-_RE_NETSCAPE_TAGS = re.compile(r'\bTAGS="([^"]*)"', re.I)
-_RE_NETSCAPE_ADDDATE = re.compile(r'\bADD_DATE="(\d+)"')
-_RE_NETSCAPE_DLEND = re.compile(r"</DL\b", re.I)
-_RE_HTML_TAG = re.compile(r"<[^>]+>")
+# Escape tables for Netscape export: one C-level pass per field.
+_TITLE_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_URL_ESC = str.maketrans({"&": "&amp;", '"': "&quot;"})
 
 
-def _build_netscape_tree(entries: List[Tuple[str, Dict[str, Any]]]) -> str:
-    """Build Netscape HTML with folder hierarchy from entries."""
+def _build_netscape_tree(entries: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """Build Netscape HTML with folder hierarchy from entries, as chunks to write."""
     # entries: list of (path, meta)
     # path is like "dev/python/fastapi-abc"
     # meta has url, title, etc.
 
-    def build_html(node: Dict[str, Any]) -> str:
-        html = ""
+    def build_html(node: Dict[str, Any]) -> None:
         # first bookmarks, then folders
-        bookmarks = node.get("__bookmarks__", [])
-        for bm in bookmarks:
-            html += bm
-        for key, value in sorted(node.items()):
-            if key == "__bookmarks__":
-                continue
-            if isinstance(value, dict):
-                # folder
-                html += f"<DT><H3>{key}</H3>\n<DL><p>\n"
-                html += build_html(value)
-                html += "</DL><p>\n"
-        return html
-
-    root = {}
+        out.extend(node.get("__bookmarks__", ()))
+        for key in sorted(k for k in node if k != "__bookmarks__"):
+            # folder
+            out.append(f"<DT><H3>{key}</H3>\n<DL><p>\n")
+            build_html(node[key])
+            out.append("</DL><p>\n")
+
+    root: Dict[str, Any] = {}
     for path, meta in entries:
         parts = path.split("/")
         current = root
@@ -761,24 +865,21 @@ def _build_netscape_tree(entries: List[Tuple[str, Dict[str, Any]]]) -> str:
         # now current is the dict for the folder containing the bookmark
         if "__bookmarks__" not in current:
             current["__bookmarks__"] = []
-        add_date = to_epoch(parse_iso(meta.get("created")) or parse_iso(meta.get("modified"))) or ""
+        add_date = meta_epoch(meta) or ""
         tags = ",".join(meta.get("tags", []))
-        title = (
-            (meta.get("title") or meta.get("url") or "")
-            .replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-        )
-        url = (meta.get("url") or "").replace("&", "&amp;").replace('"', "&quot;")
+        title = (meta.get("title") or meta.get("url") or "").translate(_TITLE_ESC)
+        url = (meta.get("url") or "").translate(_URL_ESC)
         bookmark_html = f'<DT><A HREF="{url}" ADD_DATE="{add_date}" TAGS="{tags}">{title}</A>\n'
         current["__bookmarks__"].append(bookmark_html)
 
-    return build_html(root)
+    out: List[str] = []
+    build_html(root)
+    return out
 
 
-def _export_row(rel, meta) -> Dict[str, Any]:
+def _export_row(rel: str, meta) -> Dict[str, Any]:
     return {
-        "path": str(rel),
+        "path": rel,
         "url": meta.get("url", ""),
         "title": meta.get("title", ""),
         "tags": meta.get("tags", []),
@@ -790,97 +891,142 @@ def _export_row(rel, meta) -> Dict[str, Any]:
 def cmd_export(args) -> None:
     """Export bookmarks."""
     store = Path(args.store or DEFAULT_STORE)
-    tag, host, path, since_dt = _resolve_filter_args(args)
     if args.fmt == "netscape":
-        entries = []
-        for _, rel, meta, _ in _iter_entries(store, meta_only=True):
-            if not _passes_filters(rel, meta, tag, host, path, since_dt):
-                continue
-            entries.append((str(rel), meta))
-        html_body = _build_netscape_tree(entries)
-        sys.stdout.write(NETSCAPE_HEADER + html_body + NETSCAPE_FOOTER)
+        entries = [(entry.rel, entry.meta) for entry in _iter_filtered(store, args)]
+        out = sys.stdout
+        out.write(NETSCAPE_HEADER)
+        out.writelines(_build_netscape_tree(entries))
+        out.write(NETSCAPE_FOOTER)
     elif args.fmt == "json":
         if getattr(args, "jsonl", False):
-            # Stream NDJSON one row at a time; output is unsorted.
-            for _, rel, meta, _ in _iter_entries(store, meta_only=True):
-                if not _passes_filters(rel, meta, tag, host, path, since_dt):
-                    continue
-                sys.stdout.write(json.dumps(_export_row(rel, meta), ensure_ascii=False) + "\n")
+            # Stream NDJSON row by row through one writelines call; unsorted.
+            sys.stdout.writelines(
+                _to_json(_export_row(entry.rel, entry.meta)) + "\n"
+                for entry in _iter_filtered(store, args)
+            )
             return
-        rows = []
-        for _, rel, meta, _ in _iter_entries(store, meta_only=True):
-            if not _passes_filters(rel, meta, tag, host, path, since_dt):
-                continue
-            rows.append(_export_row(rel, meta))
-        rows.sort(key=lambda r: r["path"])
-        print(json.dumps(rows, ensure_ascii=False))
+        rows = [_export_row(entry.rel, entry.meta) for entry in _iter_filtered(store, args)]
+        rows.sort(key=itemgetter("path"))
+        _write_lines([_to_json(rows)])
     else:
         die("unknown export format")
 
 
-def _parse_netscape_html(text: str) -> List[Tuple[str, Dict[str, Any]]]:
-    """Parse Netscape HTML and return list of (path, meta) for bookmarks."""
-    # Parse the HTML to extract bookmarks with their folder paths
-    entries = []
-    folder_stack = []  # list of folder names
-    lines = text.splitlines()
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        # FOLDER START: <DT><H3 ...>Name</H3>
-        m = _RE_NETSCAPE_FOLDER.search(line)
-        if m:
-            folder_name = html.unescape(m.group(1))
-            folder_stack.append(folder_name)
-            i += 1
-            continue
-        # BOOKMARK: <DT><A ... HREF="...">Title</A>
-        m = _RE_NETSCAPE_BOOKMARK.search(line)
-        if m:
-            url, title_html = m.group(1), m.group(2)
-            title = html.unescape(_RE_HTML_TAG.sub("", title_html))
-            tagm = _RE_NETSCAPE_TAGS.search(line)
-            tags = [t.strip() for t in (tagm.group(1) if tagm else "").split(",") if t.strip()]
-            path = "/".join(folder_stack) if folder_stack else ""
-            meta = {
-                "url": url,
-                "title": title.strip(),
-                "tags": tags,
-                "created": iso_now(),  # (optional: parse ADD_DATE below)
-            }
-            # harvest ADD_DATE -> created
-            add_date = _RE_NETSCAPE_ADDDATE.search(line)
-            if add_date:
-                try:
-                    meta["created"] = datetime.fromtimestamp(
-                        int(add_date.group(1)), tz=timezone.utc
-                    ).isoformat()
-                except Exception:
-                    pass
-            entries.append((path, meta))
-            i += 1
-            continue
+class _NetscapeParser(HTMLParser):
+    """Event-driven parser for Netscape bookmark HTML.
 
-        # FOLDER END: </DL> or </DL><p>
-        if _RE_NETSCAPE_DLEND.match(line):
-            if folder_stack:
-                folder_stack.pop()
-            i += 1
-            continue
+    `<H3>` opens a folder that the next `</DL>` closes; each `<A HREF>`
+    becomes a `(folder_path, meta)` entry. Character references in text and
+    attributes are decoded by HTMLParser itself, and markup nested inside a
+    title or folder name is dropped. Links without a usable `ADD_DATE` share
+    one import timestamp.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.entries: List[Tuple[str, Dict[str, Any]]] = []
+        self._now = iso_now()
+        self._folders: List[str] = []
+        self._text: Optional[List[str]] = None
+        self._link: Optional[Dict[str, Any]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "h3":
+            self._finish_link()
+            self._text = []
+        elif tag == "a":
+            self._finish_link()
+            attr = {k: v or "" for k, v in attrs}
+            if attr.get("href"):
+                self._link = attr
+                self._text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "h3" and self._text is not None and self._link is None:
+            self._folders.append("".join(self._text))
+            self._text = None
+        elif tag == "a":
+            self._finish_link()
+        elif tag == "dl" and self._folders:
+            self._folders.pop()
+
+    def handle_data(self, data: str) -> None:
+        if self._text is not None:
+            self._text.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._finish_link()
+
+    def _finish_link(self) -> None:
+        link, text = self._link, self._text
+        if link is None:
+            return
+        self._link = self._text = None
+        meta = {
+            "url": link["href"],
+            "title": "".join(text or []).strip(),
+            "tags": [t for t in (t.strip() for t in link.get("tags", "").split(",")) if t],
+            "created": self._now,
+        }
+        # harvest ADD_DATE -> created
+        add_date = link.get("add_date", "")
+        if add_date.isdigit():
+            try:
+                meta["created"] = datetime.fromtimestamp(int(add_date), tz=timezone.utc).isoformat()
+            except (OverflowError, OSError, ValueError):
+                pass
+        self.entries.append(("/".join(self._folders), meta))
+
+
+_IMPORT_CHUNK = 1 << 16
+
+
+def _parse_netscape_file(fpath: Path) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parse a Netscape HTML file into a list of (path, meta) for bookmarks.
+
+    The raw document is never held in memory as a whole; HTMLParser buffers
+    any tag split across a chunk boundary.
+    """
+    parser = _NetscapeParser()
+    with open(fpath, encoding="utf-8", errors="replace") as f:
+        for chunk in iter(lambda: f.read(_IMPORT_CHUNK), ""):
+            parser.feed(chunk)
+    parser.close()
+    return parser.entries
 
-        i += 1
-    return entries
+
+def _write_imported(fpath: Path, data: str, exists: bool, force: bool) -> bool:
+    """Write one imported bookmark; return False when skipped as a collision.
+
+    New files are created in place; only overwrites (`--force`) need the
+    temp-file-and-rename of `atomic_write`.
+    """
+    if not exists:
+        try:
+            write_new(fpath, data)
+            return True
+        except FileExistsError:
+            pass
+    if not force:
+        return False
+    atomic_write(fpath, data)
+    return True
 
 
 def cmd_import(args) -> None:
     """Import bookmarks from Netscape HTML."""
     store = Path(args.store or DEFAULT_STORE)
     store.mkdir(parents=True, exist_ok=True, mode=0o700)
-    text = Path(args.file).read_text(encoding="utf-8", errors="replace")
-    entries = _parse_netscape_html(text)
+    entries = _parse_netscape_file(Path(args.file))
     skipped_scheme = 0
     skipped_unsafe = 0
     written = 0
+    # One listing and at most one mkdir per destination folder, instead of an
+    # exists() + mkdir() pair per bookmark. Names are casefolded so
+    # case-insensitive filesystems still count as collisions.
+    listings: Dict[Path, Set[str]] = {}
+    store_real = store.resolve()
     for path, meta in entries:
         scheme = (urlparse(meta.get("url", "")).scheme or "").lower()
         if scheme not in ALLOWED_URL_SCHEMES:
@@ -889,14 +1035,23 @@ def cmd_import(args) -> None:
         slug = create_slug_from_url(meta["url"])
         full_path = f"{path}/{slug}" if path else slug
         try:
-            fpath = id_to_path(store, full_path)
+            fpath = id_to_path(store, full_path, store_real)
         except SystemExit:
             skipped_unsafe += 1
             continue
-        if fpath.exists() and not args.force:
+        parent = fpath.parent
+        names = listings.get(parent)
+        if names is None:
+            try:
+                names = {n.casefold() for n in os.listdir(parent)}
+            except FileNotFoundError:
+                parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+                names = set()
+            listings[parent] = names
+        key = fpath.name.casefold()
+        if not _write_imported(fpath, build_text(meta, ""), key in names, args.force):
             continue
-        fpath.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
-        atomic_write(fpath, build_text(meta, ""))
+        names.add(key)
         written += 1
         _progress_tick("import", written)
     _progress_done("import", written)
@@ -935,6 +1090,31 @@ def _git_cmd(*args: str) -> List[str]:
     return [*_GIT_HARDENED_PREFIX, *args]
 
 
+_HEAD_BRANCH_PREFIX = "ref: refs/heads/"
+
+
+def _may_have_upstream(store: Path) -> bool:
+    """False only when the store clearly cannot have an upstream.
+
+    Reads `.git/HEAD` and `.git/config` directly so `bm sync` can skip the
+    `rev-parse @{u}` probe (one git process) for detached checkouts and
+    stores with no remote at all. Branch tracking itself is left to git,
+    whose config syntax (case-insensitive section names, inline keys,
+    comments) is too loose to second-guess; anything unusual (a `.git` file,
+    unreadable files, config includes) also falls back to asking git.
+    """
+    git_dir = store / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        with open(git_dir / "config", encoding="utf-8") as f:
+            lines = [line.strip().lower() for line in f]
+    except (OSError, UnicodeError):
+        return True
+    if not head.startswith(_HEAD_BRANCH_PREFIX):
+        return False  # detached HEAD has no upstream
+    return any(line.startswith(("[remote", "[include")) for line in lines)
+
+
 def cmd_sync(args) -> None:
     """Sync with git."""
     store = Path(args.store or DEFAULT_STORE)
@@ -953,6 +1133,8 @@ def cmd_sync(args) -> None:
     run_git(_git_cmd("add", "-A"))
     run_git(_git_cmd("commit", "-m", "bm sync", "--allow-empty"))
     # push only if upstream exists
+    if not _may_have_upstream(store):
+        return
     r = subprocess.run(
         _git_cmd("rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"),
         cwd=store,
@@ -963,6 +1145,9 @@ def cmd_sync(args) -> None:
         run_git(_git_cmd("push"))
 
 
+_RE_RID = re.compile(r"[0-9a-f]{12}")
+
+
 def resolve_id_or_path(store: Path, token: str) -> Optional[Path]:
     """Accept either a stable ID (by URL) or a path-ish token.
 
@@ -977,20 +1162,25 @@ def resolve_id_or_path(store: Path, token: str) -> Optional[Path]:
         return exact
 
     name = Path(slug).name
-    fuzzy = [p for p in store.rglob(f"*{FILE_EXT}") if name in p.stem]
+    fuzzy = [
+        (dirent.path, rel)
+        for dirent, rel in walk_store(store)
+        if name in dirent.name[: -len(FILE_EXT)]
+    ]
     if len(fuzzy) == 1:
-        return fuzzy[0]
+        return Path(fuzzy[0][0])
     if len(fuzzy) > 1:
-        listing = "\n  ".join(str(p.relative_to(store).with_suffix("")) for p in sorted(fuzzy))
+        listing = "\n  ".join(sorted(rel for _, rel in fuzzy))
         die(f"ambiguous: {len(fuzzy)} matches for {token!r}:\n  {listing}")
 
-    # Last resort: ID match by URL hash (requires reading files).
-    for p in store.rglob(f"*{FILE_EXT}"):
-        try:
-            meta, _ = load_entry(p, meta_only=True)
-        except (OSError, ValueError, UnicodeError):
-            continue
-        url = meta.get("url", "")
-        if url and rid(url) == token:
-            return p
+    # Last resort: ID match by URL hash. Only rid-shaped tokens can match.
+    # Try the cached ID index first; rescan only when it has no fresh hit.
+    if not _RE_RID.fullmatch(token):
+        return None
+    hit = find_by_id(store, token)
+    if hit is not None:
+        return hit
+    for entry in iter_index(store):
+        if entry.id == token and entry.meta.get("url"):
+            return Path(entry.path)
     return None
@@ -0,0 +1,184 @@
+"""Persistent metadata index for the bookmark store.
+
+Parsed front matter is cached per store in a JSON file under the user cache
+directory, keyed by store-relative path. Each record carries the stat
+signature (mtime_ns, size, inode) of the file it was parsed from and is only
+reused while that signature still matches, so edits made outside `bm` are
+picked up on the next scan.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Generator, List, Optional, Tuple
+
+from .io import atomic_write, load_entry, map_io, walk_store
+from .models import FILE_EXT
+from .utils import meta_epoch, rid, url_host
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class IndexEntry:
+    """A bookmark file, its (possibly cached) front matter, and values derived from it.
+
+    `path` is the file's path and `rel` its '/'-joined store-relative path
+    without extension, both as plain strings to keep hot loops free of `Path`
+    construction.
+    """
+
+    path: str
+    rel: str
+    meta: Dict[str, Any]
+    host: str = ""
+    ts: Optional[int] = None
+    id: str = ""
+
+    @cached_property
+    def tagset(self) -> FrozenSet[str]:
+        """Header tags plus parent folder segments, built on first use."""
+        return frozenset(self.meta.get("tags", ())).union(self.rel.split("/")[:-1])
+
+
+def cache_dir() -> Path:
+    """Return the directory holding store indexes.
+
+    Honors `$BM_CACHE_DIR`, then `$XDG_CACHE_HOME/bm`, then `~/.cache/bm`.
+    """
+    override = os.environ.get("BM_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "bm"
+
+
+def index_path(store: Path) -> Path:
+    """Return the index file for `store` (one file per resolved store path)."""
+    key = hashlib.blake2b(str(store.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return cache_dir() / f"{key}.json"
+
+
+def _signature(st: os.stat_result) -> List[int]:
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _is_fresh(rec: Any, sig: List[int]) -> bool:
+    return (
+        isinstance(rec, dict)
+        and rec.get("sig") == sig
+        and isinstance(rec.get("meta"), dict)
+        and isinstance(rec.get("host"), str)
+        and "ts" in rec
+        and isinstance(rec.get("id"), str)
+    )
+
+
+def _make_record(sig: List[int], meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an index record, precomputing the values filters and rows need per entry."""
+    url = meta.get("url", "")
+    return {
+        "sig": sig,
+        "meta": meta,
+        "host": url_host(url),
+        "ts": meta_epoch(meta),
+        "id": rid(url),
+    }
+
+
+def load_index(store: Path) -> Dict[str, Dict[str, Any]]:
+    """Load the cached records for `store`; missing or unreadable indexes are empty."""
+    try:
+        with open(index_path(store), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_index(store: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    """Persist records for `store`. Failures are ignored; the index is only a cache."""
+    path = index_path(store)
+    data = {"version": INDEX_VERSION, "entries": entries}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        atomic_write(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        pass
+
+
+def _load_meta(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    try:
+        meta, _ = load_entry(Path(path), meta_only=True)
+    except (OSError, ValueError, UnicodeError) as exc:
+        return None, exc
+    return meta, None
+
+
+def iter_index(store: Path) -> Generator[IndexEntry, None, None]:
+    """Yield every bookmark in `store` with its front matter, reusing cached records.
+
+    Only files whose stat signature changed since the last scan are parsed,
+    on a thread pool when there are many. The index is rewritten before the
+    first entry is yielded if anything was added, refreshed, or removed, so
+    callers may stop early. Unreadable files are skipped with a stderr warning.
+    """
+    old = load_index(store)
+    new: Dict[str, Dict[str, Any]] = {}
+    found: List[Tuple[str, str]] = []
+    stale: List[Tuple[str, str, List[int]]] = []
+    for dirent, key in walk_store(store):
+        try:
+            sig = _signature(dirent.stat())
+        except OSError as exc:
+            print(f"bm: skipping {key}: {exc}", file=sys.stderr)
+            continue
+        rec = old.get(key)
+        if _is_fresh(rec, sig):
+            new[key] = rec
+        else:
+            stale.append((dirent.path, key, sig))
+        found.append((dirent.path, key))
+
+    dirty = False
+    parsed = map_io(_load_meta, [path for path, _, _ in stale])
+    for (_, key, sig), (meta, exc) in zip(stale, parsed):
+        if exc is not None:
+            print(f"bm: skipping {key}: {exc}", file=sys.stderr)
+            continue
+        new[key] = _make_record(sig, meta)
+        dirty = True
+    if dirty or len(new) != len(old):
+        save_index(store, new)
+
+    for path, key in found:
+        rec = new.get(key)
+        if rec is not None:
+            yield IndexEntry(path, key, rec["meta"], rec["host"], rec["ts"], rec["id"])
+
+
+def find_by_id(store: Path, bid: str) -> Optional[Path]:
+    """Return the bookmark whose cached ID is `bid`, without walking the store.
+
+    Only records whose file still has the recorded stat signature are
+    trusted, so a hit costs one `stat`. Returns None on a miss; callers that
+    must also see new or edited files fall back to `iter_index`.
+    """
+    for key, rec in load_index(store).items():
+        if not isinstance(rec, dict) or rec.get("id") != bid:
+            continue
+        path = os.path.join(os.fspath(store), *key.split("/")) + FILE_EXT
+        try:
+            sig = _signature(os.stat(path))
+        except OSError:
+            continue
+        if _is_fresh(rec, sig) and rec["meta"].get("url"):
+            return Path(path)
+    return None
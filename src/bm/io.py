@@ -2,11 +2,13 @@
 
 import os
 import stat
+import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Generator, List, Sequence, Tuple, TypeVar
 
-from .models import FM_END, FM_START
+from .models import FILE_EXT, FM_END, FM_START
 
 
 def _normalize_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
@@ -22,12 +24,18 @@ def _normalize_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
         m["tags"] = [t.strip() for t in m["tags"].split(",") if t.strip()]
     if "tags" not in m:
         m["tags"] = []
+    else:
+        # The same few tags recur across a store; share one string per tag.
+        m["tags"] = [sys.intern(t) if type(t) is str else t for t in m["tags"]]
     return m
 
 
 def _parse_tags(v: str) -> List[str]:
     if v.startswith("[") and v.endswith("]"):
         inner = v[1:-1].strip()
+        if inner and '"' not in inner and "'" not in inner:
+            # No quoting: a plain comma split gives the same result.
+            return [t for t in (t.strip() for t in inner.split(",")) if t]
         if inner:
             parts = []
             buf, inq = "", False
@@ -104,11 +112,11 @@ def _parse_header(header: str) -> Dict[str, Any]:
             i += 1
             continue
 
-        if ":" not in line:
+        key, sep, value = line.partition(":")
+        if not sep:
             i += 1
             continue
 
-        key, value = line.split(":", 1)
         key = key.strip().lower()
         value = value.strip()
 
@@ -152,63 +160,93 @@ def parse_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
     return _normalize_meta(meta), body.lstrip("\n")
 
 
+def split_body(text: str) -> str:
+    """Return the body `parse_front_matter` would, without parsing the header."""
+    if not text.startswith(FM_START):
+        return _parse_no_front_matter(text)[1]
+    rest = text[len(FM_START) :]
+    end_idx = rest.find(FM_END)
+    if end_idx == -1:
+        return text
+    return rest[end_idx + len(FM_END) :].lstrip("\n")
+
+
 def _fmt_tag(t: str) -> str:
     """Quote tags containing commas, spaces, or empty."""
     return f'"{t}"' if ("," in t or " " in t or t == "") else t
 
 
+_KEY_ORDER = ("url", "title", "tags", "created", "modified", "notes")
+
+
 def build_text(meta: Dict[str, Any], body: str) -> str:
     """Render front matter with ordered keys; lists as [a, b] with quoting when needed."""
     m = _normalize_meta(meta)
     m = {k: v for k, v in m.items() if v not in (None, "", [])}
-    order = ["url", "title", "tags", "created", "modified", "notes"]
-    keys = [k for k in order if k in m] + [k for k in m if k not in order]
+    keys = [k for k in _KEY_ORDER if k in m] + [k for k in m if k not in _KEY_ORDER]
     lines = [FM_START]
     for k in keys:
         v = m[k]
         if isinstance(v, list):
             lines.append(f"{k}: [{', '.join(_fmt_tag(t) for t in v)}]\n")
+            continue
+        v = str(v)
+        if "\n" in v:
+            lines.append(f"{k}: |\n")
+            lines.extend(f"  {ln}\n" for ln in v.splitlines())
         else:
-            if "\n" in str(v):
-                lines.append(f"{k}: |\n")
-                for ln in str(v).splitlines():
-                    lines.append(f"  {ln}\n")
-            else:
-                lines.append(f"{k}: {v}\n")
+            lines.append(f"{k}: {v}\n")
     lines.append(FM_END)
-    fm = "".join(lines)
-    return fm + (body or "")
+    # Body joins with the header in one pass rather than a second concatenation.
+    lines.append(body or "")
+    return "".join(lines)
 
 
 _FM_DELIM = b"---\n"
+_FM_DELIM_CRLF = b"---\r\n"
+
+
+def _decode_text(buf: bytes) -> str:
+    """Decode like `read_text`: replace bad bytes, universal newlines."""
+    text = buf.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 def _read_meta_only(fpath: Path) -> str:
-    """Read just enough bytes to locate the closing FM_END marker.
+    """Read just enough bytes to parse the front matter.
 
-    Falls back to the full file when the second `---` cannot be found
-    in the prefix (so callers see the same behavior as the prior path).
+    Front-matter files are read up to the closing FM_END marker. Files
+    without front matter can only carry a bare URL on their first line, so
+    reading stops at the first newline. Falls back to the full file when the
+    closing marker never appears (so callers see the same behavior as a full
+    read). CRLF files are accepted and returned with `\n` line endings.
     """
     chunk_size = 8192
-    buf = bytearray()
     with open(fpath, "rb") as f:
+        buf = bytearray(f.read(chunk_size))
+        # Classify the file once with a bytes prefix test, then scan only for
+        # the markers that end its metadata.
+        if buf.startswith(_FM_DELIM):
+            markers, start = (_FM_DELIM,), len(_FM_DELIM)
+        elif buf.startswith(_FM_DELIM_CRLF):
+            # The closing line may use either ending once newlines are normalized.
+            markers, start = (_FM_DELIM_CRLF, _FM_DELIM), len(_FM_DELIM_CRLF)
+        else:
+            markers, start = (b"\n",), 0
+        longest = max(len(m) for m in markers)
         while True:
+            ends = [hit + len(m) for m in markers for hit in (buf.find(m, start),) if hit != -1]
+            if ends:
+                return _decode_text(buf[: min(ends)])
             piece = f.read(chunk_size)
             if not piece:
                 break
+            # Resume scanning where the previous chunk left off.
+            start = max(start, len(buf) - longest + 1)
             buf.extend(piece)
-            if buf.startswith(_FM_DELIM):
-                # Locate the closing delimiter after the opening one.
-                close = buf.find(_FM_DELIM, len(_FM_DELIM))
-                if close != -1:
-                    end = close + len(_FM_DELIM)
-                    return buf[:end].decode("utf-8", errors="replace")
-            elif len(buf) >= len(_FM_DELIM):
-                # Not a front-matter file; let the regular parser handle it.
-                return buf.decode("utf-8", errors="replace") + f.read().decode(
-                    "utf-8", errors="replace"
-                )
-    return buf.decode("utf-8", errors="replace")
+    return _decode_text(buf)
 
 
 def load_entry(fpath: Path, meta_only: bool = False) -> Tuple[Dict[str, Any], str]:
@@ -222,6 +260,62 @@ def load_entry(fpath: Path, meta_only: bool = False) -> Tuple[Dict[str, Any], st
     return meta, body
 
 
+def load_body(fpath: Path) -> str:
+    """Load only the body from file, skipping front matter parsing."""
+    return split_body(fpath.read_text(encoding="utf-8", errors="replace"))
+
+
+def walk_store(store: Path) -> Generator[Tuple["os.DirEntry[str]", str], None, None]:
+    """Yield `(entry, rel)` for every bookmark file under `store`.
+
+    `rel` is the '/'-joined store-relative path without the extension. One
+    `os.scandir` call per directory supplies names, types and (via
+    `entry.stat()`) stat results without building a `Path` per file.
+    Symlinked directories are not followed (same as `Path.rglob`) and `.git`
+    is skipped. Unreadable directories are silently ignored.
+    """
+    ext_len = len(FILE_EXT)
+    stack = [(os.fspath(store), "")]
+    while stack:
+        top, prefix = stack.pop()
+        try:
+            it = os.scandir(top)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir and name != ".git":
+                    stack.append((entry.path, f"{prefix}{name}/"))
+                # Directories named `*.bm` are yielded too, like rglob, so
+                # callers surface them as unreadable instead of hiding them.
+                if name.endswith(FILE_EXT):
+                    yield entry, prefix + name[:-ext_len]
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Below this many items, thread start-up costs more than overlapping I/O saves.
+_PARALLEL_MIN = 32
+
+
+def map_io(fn: Callable[[_T], _R], items: Sequence[_T]) -> List[_R]:
+    """Apply `fn` to each item, overlapping file reads on a thread pool.
+
+    Results keep input order. Exceptions propagate, so `fn` should catch the
+    per-file errors it wants to tolerate.
+    """
+    if len(items) < _PARALLEL_MIN:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor() as pool:
+        return list(pool.map(fn, items))
+
+
 def atomic_write(path: Path, data: str) -> None:
     """Write data to path atomically.
 
@@ -247,3 +341,22 @@ def atomic_write(path: Path, data: str) -> None:
         except OSError:
             pass
         raise
+
+
+def write_new(path: Path, data: str) -> None:
+    """Create `path` holding `data`; raise FileExistsError if anything is there.
+
+    Cheaper than `atomic_write` for files that do not exist yet (no temp file
+    or rename), for bulk creation such as import. `O_EXCL` also refuses to
+    follow a planted symlink. A failed write removes the partial file.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        raise
@@ -7,13 +7,19 @@ import re
 import shlex
 import subprocess
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import ParseResult, parse_qsl, urlencode, urlparse
 
 from .models import FILE_EXT
 
+_RE_DATE_ONLY = re.compile(r"\d{4}-\d{2}-\d{2}")
+_RE_SLUG_BAD = re.compile(r"[^\w\-/\.]")
+_RE_DASH_RUN = re.compile(r"-{2,}")
+_RE_SLASH_RUN = re.compile(r"/+")
+
 
 def die(msg: str, code: int = 1) -> None:
     """Print an error message to stderr and exit with the given code.
@@ -27,8 +33,12 @@ def die(msg: str, code: int = 1) -> None:
 
 
 def iso_now() -> str:
-    """Return current ISO-8601 timestamp with local offset, no microseconds."""
-    return datetime.now(timezone.utc).astimezone().replace(microsecond=0).isoformat()
+    """Return current ISO-8601 timestamp with local offset, no microseconds.
+
+    Truncating the epoch up front avoids a `.replace()` copy; the local
+    offset is still looked up per call so DST changes are honored.
+    """
+    return datetime.fromtimestamp(int(time.time()), timezone.utc).astimezone().isoformat()
 
 
 def _normalize_iso_z(ts: str) -> str:
@@ -53,7 +63,7 @@ def parse_iso(ts: str) -> Optional[datetime]:
     ts = ts.strip()
     try:
         # bare date → treat as start-of-day local time
-        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", ts):
+        if _RE_DATE_ONLY.fullmatch(ts):
             dt = datetime.fromisoformat(ts + "T00:00:00")
             return dt.astimezone()  # localize
         return datetime.fromisoformat(_normalize_iso_z(ts))
@@ -62,17 +72,29 @@ def parse_iso(ts: str) -> Optional[datetime]:
 
 
 def to_epoch(dt: Optional[datetime]) -> Optional[int]:
-    """Convert datetime to epoch timestamp."""
+    """Convert datetime to epoch timestamp; None when it cannot be represented.
+
+    Naive datetimes at the edges of the calendar (year 1 or 9999) can fall
+    outside the supported range once the local offset is applied.
+    """
     if not dt:
         return None
-    return int(dt.timestamp())
+    try:
+        return int(dt.timestamp())
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def meta_epoch(meta: Dict[str, Any]) -> Optional[int]:
+    """Epoch seconds of an entry's `created` (else `modified`) timestamp, or None."""
+    return to_epoch(parse_iso(meta.get("created", "")) or parse_iso(meta.get("modified", "")))
 
 
 def normalize_slug(s: str) -> str:
     """Normalize string to a slug."""
     s = s.lower().strip().strip("/").replace(" ", "-")
-    s = re.sub(r"[^\w\-/\.]", "", s)
-    s = re.sub(r"-{2,}", "-", s)
+    s = _RE_SLUG_BAD.sub("", s)
+    s = _RE_DASH_RUN.sub("-", s)
     s = s.strip("-")
     if "/" in s:
         parts = [p.strip("-") for p in s.split("/") if p]
@@ -99,27 +121,44 @@ def _reject_unsafe(rel: str) -> str:
     return "/".join(parts)
 
 
-def is_relative_to(path: Path, base: Path) -> bool:
-    """Check if path is relative to base."""
+def is_relative_to(path: Path, base: Path, *, base_is_resolved: bool = False) -> bool:
+    """Check if path is relative to base.
+
+    Pass `base_is_resolved=True` when `base` is already resolved to skip
+    re-resolving it; `path` is always resolved so symlinks cannot escape.
+    """
     try:
-        path.resolve().relative_to(base.resolve())
+        path.resolve().relative_to(base if base_is_resolved else base.resolve())
         return True
     except Exception:
         return False
 
 
-def id_to_path(store: Path, slug: str) -> Path:
-    """Convert slug to a store-relative path; rejects escapes."""
+def id_to_path(store: Path, slug: str, store_real: Optional[Path] = None) -> Path:
+    """Convert slug to a store-relative path; rejects escapes.
+
+    Bulk callers may pass `store_real`, the store already resolved once, so
+    each call only resolves the destination.
+    """
     slug = normalize_slug(slug)
     slug = _reject_unsafe(slug)
     fpath = store / (slug + FILE_EXT)
-    if not is_relative_to(fpath, store):
+    if store_real is None:
+        inside = is_relative_to(fpath, store)
+    else:
+        inside = is_relative_to(fpath, store_real, base_is_resolved=True)
+    if not inside:
         die("destination escapes store")
     return fpath
 
 
 def _short_sha(s: str) -> str:
-    """Short SHA1 hash."""
+    """Short SHA1 hash.
+
+    Used as the slug suffix for URL-derived filenames. Re-imports detect
+    existing bookmarks by filename, so changing the algorithm would turn
+    every re-import into a duplicate set of files.
+    """
     return hashlib.sha1(s.encode("utf-8")).hexdigest()[:7]
 
 
@@ -128,6 +167,18 @@ def _strip_leading_www(host: str) -> str:
     return host[4:] if host.startswith("www.") else host
 
 
+def url_host(url: str) -> str:
+    """Return the lowercased host[:port] of `url` without a leading "www.".
+
+    Malformed URLs (e.g. an unclosed IPv6 bracket) have no host: "".
+    """
+    try:
+        netloc = urlparse(url).netloc
+    except ValueError:
+        return ""
+    return _strip_leading_www(netloc.lower())
+
+
 def _port_or_none(parsed: ParseResult) -> Optional[int]:
     """Return a parsed URL port, treating invalid ports as absent."""
     try:
@@ -190,7 +241,13 @@ def create_slug_from_url(url: str) -> str:
 
 
 def rid(url: str) -> str:
-    """Stable short ID based on URL only (rename-safe)."""
+    """Stable short ID based on URL only (rename-safe).
+
+    The algorithm and width are part of the CLI contract: IDs are printed by
+    `add`/`list` and kept in user scripts, so changing either would break
+    every existing reference. IDs are computed once per file change and
+    cached in the metadata index, so hashing cost is off the read path.
+    """
     return hashlib.blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
 
 
@@ -236,7 +293,7 @@ def _normalize_path_for_compare(path: str) -> str:
         path = f"/{path}"
 
     # Collapse duplicate slashes and resolve ".."/"." segments
-    collapsed = re.sub(r"/+", "/", path)
+    collapsed = _RE_SLASH_RUN.sub("/", path)
     normalized = posixpath.normpath(collapsed)
 
     # posixpath.normpath strips trailing slash; treat root specially
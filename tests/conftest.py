@@ -1,16 +1,59 @@
 """Shared pytest fixtures for the bm test suite."""
 
 import argparse
+import itertools
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+_store_ids = itertools.count()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--bench", action="store_true", help="run tests marked bench")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list) -> None:
+    """Skip `bench` tests unless asked for with --bench and a benchmark plugin is loaded.
+
+    Checking the plugin manager (not just importability) keeps the module
+    skipped under PYTEST_DISABLE_PLUGIN_AUTOLOAD, where no `benchmark`
+    fixture is registered.
+    """
+    pm = config.pluginmanager
+    if not config.getoption("--bench"):
+        reason = "benchmarks run only with --bench"
+    elif not (pm.hasplugin("benchmark") or pm.hasplugin("codspeed")):
+        reason = "needs the pytest-benchmark or pytest-codspeed plugin"
+    else:
+        return
+    skip = pytest.mark.skip(reason=reason)
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="module")
+def store_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """One temp directory per test module; tests mint cheap subdirectories in it."""
+    return tmp_path_factory.mktemp("bm")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(store_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep store indexes out of the user's real cache directory.
+
+    Index files are keyed by store path, so tests with distinct stores can
+    share one cache directory per module.
+    """
+    monkeypatch.setenv("BM_CACHE_DIR", str(store_root / "cache"))
+
 
 @pytest.fixture
-def store(tmp_path: Path) -> Path:
+def store(store_root: Path) -> Path:
     """Return a fresh store directory ready for use by commands."""
-    s = tmp_path / "store"
+    s = store_root / f"store{next(_store_ids)}"
     s.mkdir()
     return s
 
@@ -0,0 +1,51 @@
+"""Micro-benchmarks for per-bookmark hot paths.
+
+Skipped by default; run with `pytest tests/test_bench.py --bench` (needs
+pytest-benchmark from the dev extra). The CodSpeed CI job runs the same
+tests with `--bench --codspeed`.
+"""
+
+import pytest
+
+from bm.commands import resolve_id_or_path
+from bm.utils import create_slug_from_url, normalize_slug, parse_iso, rid
+
+pytestmark = pytest.mark.bench
+
+
+class TestBench:
+    """Benchmark helpers called once per bookmark."""
+
+    def test_rid_bench(self, benchmark):
+        """rid is tiny, so pin rounds and iterations for stable timings."""
+        result = benchmark.pedantic(
+            rid,
+            args=("https://example.com/some/path",),
+            rounds=1000,
+            iterations=100,
+            warmup_rounds=10,
+        )
+        assert len(result) == 12
+
+    def test_normalize_slug_bench(self, benchmark):
+        """Benchmark normalize_slug on input with special characters."""
+        assert benchmark(normalize_slug, "Hello World! @#$") == "hello-world"
+
+    def test_normalize_slug_large_bench(self, benchmark):
+        """Benchmark normalize_slug on a long title, where the regex passes dominate."""
+        assert benchmark(normalize_slug, "Hello World! " * 100).startswith("hello-world-")
+
+    def test_create_slug_from_url_bench(self, benchmark):
+        """Benchmark create_slug_from_url on a URL with a query string."""
+        assert benchmark(create_slug_from_url, "https://example.com/path?x=1")
+
+    def test_parse_iso_bench(self, benchmark):
+        """Benchmark parse_iso on a full timestamp."""
+        assert benchmark(parse_iso, "2023-01-15T10:30:45+05:00") is not None
+
+    def test_resolve_fuzzy_100_bench(self, benchmark, store):
+        """Benchmark a unique fuzzy filename match over a 100-file store."""
+        for i in range(100):
+            (store / f"n{i:03d}-note.bm").write_text("", encoding="utf-8")
+        result = benchmark(resolve_id_or_path, store, "n050")
+        assert result == store / "n050-note.bm"
@@ -1,121 +1,116 @@
 """Direct unit tests for internal helpers; targets mutmut gaps."""
 
 from datetime import datetime, timezone
-from pathlib import Path
 
 import pytest
 
 from bm.commands import (
+    _build_netscape_tree,
     _build_row,
     _build_search_blob,
+    _compile_filters,
     _entry_score,
     _export_row,
+    _is_empty_dir,
     _make_search_predicate,
     _matches_host,
     _matches_path,
     _matches_since,
     _matches_tag,
+    _newest_first,
     _normalize_path_arg,
-    _passes_filters,
+    _parse_netscape_file,
     _resolve_filter_args,
 )
+from bm.index import IndexEntry
 
 
 class TestMatchesPath:
     def test_empty_prefix_matches_any(self):
-        assert _matches_path(Path("dev/python/foo"), "") is True
-        assert _matches_path(Path("dev/python/foo"), None) is True
+        assert _matches_path("dev/python/foo", "") is True
+        assert _matches_path("dev/python/foo", None) is True
 
     def test_strips_leading_and_trailing_slashes(self):
-        assert _matches_path(Path("dev/python/foo"), "/dev/python/") is True
-        assert _matches_path(Path("dev/python/foo"), "//dev//") is True
+        assert _matches_path("dev/python/foo", "/dev/python/") is True
+        assert _matches_path("dev/python/foo", "//dev//") is True
 
     def test_strip_removes_only_slashes(self):
         # Leading/trailing letters are significant path text, not strip chars.
-        assert _matches_path(Path("dev"), "/XdevX/") is False
+        assert _matches_path("dev", "/XdevX/") is False
 
     def test_exact_match_returns_true(self):
-        assert _matches_path(Path("dev/python"), "dev/python") is True
+        assert _matches_path("dev/python", "dev/python") is True
 
     def test_prefix_match_requires_segment_boundary(self):
         # Should not match `dev/pythonista` for prefix `dev/python` (no boundary).
-        assert _matches_path(Path("dev/pythonista"), "dev/python") is False
-        assert _matches_path(Path("dev/python/x"), "dev/python") is True
+        assert _matches_path("dev/pythonista", "dev/python") is False
+        assert _matches_path("dev/python/x", "dev/python") is True
 
     def test_non_matching_returns_false(self):
-        assert _matches_path(Path("news/x"), "dev") is False
+        assert _matches_path("news/x", "dev") is False
 
     def test_blank_after_strip_treated_as_empty(self):
-        assert _matches_path(Path("anything"), "/") is True
+        assert _matches_path("anything", "/") is True
+
+
+def _tagset(rel, meta):
+    return IndexEntry("unused", rel, meta).tagset
 
 
 class TestMatchesTag:
     def test_no_tag_matches(self):
-        assert _matches_tag(Path("a/b"), {"tags": []}, None) is True
-        assert _matches_tag(Path("a/b"), {"tags": []}, "") is True
+        assert _matches_tag(_tagset("a/b", {"tags": []}), None) is True
+        assert _matches_tag(_tagset("a/b", {"tags": []}), "") is True
 
     def test_folder_segment_matches(self):
-        assert _matches_tag(Path("dev/python/foo"), {"tags": []}, "python") is True
+        assert _matches_tag(_tagset("dev/python/foo", {"tags": []}), "python") is True
 
     def test_header_tag_matches(self):
-        assert _matches_tag(Path("foo"), {"tags": ["news"]}, "news") is True
+        assert _matches_tag(_tagset("foo", {"tags": ["news"]}), "news") is True
 
     def test_filename_stem_excluded_from_match(self):
         # Only parent segments count; the filename stem itself is excluded.
-        assert _matches_tag(Path("python"), {"tags": []}, "python") is False
+        assert _matches_tag(_tagset("python", {"tags": []}), "python") is False
 
     def test_unmatched_tag_returns_false(self):
-        assert _matches_tag(Path("dev/python"), {"tags": ["foo"]}, "missing") is False
+        assert _matches_tag(_tagset("dev/python", {"tags": ["foo"]}), "missing") is False
 
     def test_meta_without_tags_key_does_not_crash(self):
         # Defensive: missing 'tags' key must not raise TypeError.
-        assert _matches_tag(Path("foo"), {}, "missing") is False
-        assert _matches_tag(Path("dev/foo"), {}, "dev") is True
+        assert _matches_tag(_tagset("foo", {}), "missing") is False
+        assert _matches_tag(_tagset("dev/foo", {}), "dev") is True
 
 
 class TestMatchesHost:
     def test_no_filter_matches(self):
-        assert _matches_host({"url": "https://x.com"}, "") is True
-
-    def test_www_prefix_ignored_on_both_sides(self):
-        assert _matches_host({"url": "https://www.example.com"}, "example.com") is True
-        assert _matches_host({"url": "https://example.com"}, "www.example.com") is True
-
-    def test_case_insensitive(self):
-        assert _matches_host({"url": "https://EXAMPLE.com"}, "example.com") is True
+        assert _matches_host("x.com", "") is True
 
     def test_different_host_excluded(self):
-        assert _matches_host({"url": "https://other.com"}, "example.com") is False
+        assert _matches_host("other.com", "example.com") is False
 
-    def test_meta_without_url_key_does_not_crash(self):
-        # Missing 'url' key must yield empty host, not raise.
-        assert _matches_host({}, "example.com") is False
+    def test_empty_entry_host_excluded(self):
+        assert _matches_host("", "example.com") is False
 
 
 class TestMatchesSince:
+    CUTOFF = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
     def test_no_filter_matches(self):
-        assert _matches_since({"created": "2020-01-01"}, None) is True
+        assert _matches_since(0, None) is True
+        assert _matches_since(None, None) is True
 
     def test_after_threshold_matches(self):
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _matches_since({"created": "2024-06-01T00:00:00+00:00"}, cutoff) is True
+        assert _matches_since(self.CUTOFF + 86400, self.CUTOFF) is True
 
     def test_before_threshold_excluded(self):
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _matches_since({"created": "2023-12-31T00:00:00+00:00"}, cutoff) is False
-
-    def test_falls_back_to_modified_when_created_missing(self):
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _matches_since({"modified": "2024-06-01T00:00:00+00:00"}, cutoff) is True
+        assert _matches_since(self.CUTOFF - 86400, self.CUTOFF) is False
 
     def test_no_dates_returns_false_under_filter(self):
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _matches_since({}, cutoff) is False
+        assert _matches_since(None, self.CUTOFF) is False
 
     def test_exact_boundary_inclusive(self):
         # `--since X` should include entries timestamped at exactly X.
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _matches_since({"created": "2024-01-01T00:00:00+00:00"}, cutoff) is True
+        assert _matches_since(self.CUTOFF, self.CUTOFF) is True
 
 
 class TestNormalizePathArg:
@@ -135,13 +130,20 @@ class TestResolveFilterArgs:
     def test_string_path_honored(self):
         import argparse
 
-        ns = argparse.Namespace(tag="dev", host="EXAMPLE.com", path="/foo/", since=None)
+        ns = argparse.Namespace(tag="dev", host="www.EXAMPLE.com", path="/foo/", since=None)
         tag, host, path, since = _resolve_filter_args(ns)
         assert tag == "dev"
         assert host == "example.com"
         assert path == "foo"
         assert since is None
 
+    def test_since_converted_to_epoch(self):
+        import argparse
+
+        ns = argparse.Namespace(tag=None, host=None, path=None, since="2024-01-01T00:00:00+00:00")
+        *_, since = _resolve_filter_args(ns)
+        assert since == int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
     def test_non_string_collapses_to_neutral(self):
         import argparse
 
@@ -160,37 +162,71 @@ class TestResolveFilterArgs:
         assert tag is None
 
 
-class TestPassesFilters:
-    def test_all_filters_must_pass(self):
-        rel = Path("dev/python/foo")
+class TestCompileFilters:
+    def test_no_active_filters_returns_none(self):
+        assert _compile_filters(None, "", "", None) is None
+        assert _compile_filters(None, "", "/", None) is None
+
+    def test_tag_set_not_built_when_cheaper_filter_rejects(self):
+        entry = IndexEntry("/s/dev/x.bm", "dev/x", {"tags": ["a"]}, host="e.com", ts=10)
+        pred = _compile_filters("a", "other.com", "", None)
+        assert pred(entry) is False
+        assert "tagset" not in entry.__dict__
+
+    def test_all_filters_combined(self):
+        entry = IndexEntry("/s/dev/x.bm", "dev/x", {"tags": ["a"]}, host="e.com", ts=10)
+        assert _compile_filters("a", "e.com", "dev", 5)(entry) is True
+        assert _compile_filters("a", "e.com", "dev", 11)(entry) is False
+        assert _compile_filters("a", "e.com", "news", 5)(entry) is False
+
+    def test_each_filter_must_pass(self):
+        rel = "dev/python/foo"
         meta = {"url": "https://example.com", "tags": ["lang"], "created": "2024-06-01"}
-        cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
-        assert _passes_filters(rel, meta, "lang", "example.com", "dev", cutoff) is True
+        ts = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp())
+        entry = IndexEntry("unused", rel, meta, "example.com", ts)
+        cutoff = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+        assert _compile_filters("lang", "example.com", "dev", cutoff)(entry) is True
         # Wrong tag — fails
-        assert _passes_filters(rel, meta, "other", "example.com", "dev", cutoff) is False
+        assert _compile_filters("other", "example.com", "dev", cutoff)(entry) is False
         # Wrong host — fails
-        assert _passes_filters(rel, meta, "lang", "wrong.com", "dev", cutoff) is False
+        assert _compile_filters("lang", "wrong.com", "dev", cutoff)(entry) is False
         # Wrong path — fails
-        assert _passes_filters(rel, meta, "lang", "example.com", "news", cutoff) is False
+        assert _compile_filters("lang", "example.com", "news", cutoff)(entry) is False
 
 
 class TestBuildRowAndExport:
     def test_build_row_id_and_path(self):
         from bm.utils import rid
 
-        row = _build_row(
-            Path("dev/x"),
-            {"url": "https://e.com", "title": "T", "tags": ["a"], "created": "c", "modified": "m"},
-            None,
-        )
+        meta = {
+            "url": "https://e.com",
+            "title": "T",
+            "tags": ["a"],
+            "created": "c",
+            "modified": "m",
+        }
+        row = _build_row(IndexEntry("/s/dev/x.bm", "dev/x", meta, id=rid("https://e.com")))
         assert row["id"] == rid("https://e.com")
         assert row["path"] == "dev/x"
         assert row["title"] == "T"
         assert row["tags"] == ["a"]
 
+    def test_build_row_has_no_sort_field(self):
+        row = _build_row(IndexEntry("/s/x.bm", "x", {}, ts=5))
+        assert "_sort" not in row
+
+    def test_newest_first_puts_undated_last_in_walk_order(self):
+        entries = [
+            IndexEntry("/s/a.bm", "a", {}),
+            IndexEntry("/s/b.bm", "b", {}, ts=1),
+            IndexEntry("/s/c.bm", "c", {}),
+            IndexEntry("/s/d.bm", "d", {}, ts=3),
+        ]
+        assert [e.rel for e in _newest_first(entries)] == ["d", "b", "a", "c"]
+
     def test_export_row_schema(self):
         row = _export_row(
-            Path("dev/x"),
+            "dev/x",
             {"url": "https://e.com", "title": "T", "tags": ["a"], "created": "c", "modified": "m"},
         )
         assert set(row.keys()) == {"path", "url", "title", "tags", "created", "modified"}
@@ -200,14 +236,14 @@ class TestBuildRowAndExport:
 
 class TestEntryScore:
     def test_longer_body_wins(self):
-        a = {"meta": {"title": "T"}, "body": "short", "rel": Path("a")}
-        b = {"meta": {"title": "T"}, "body": "much longer body text here", "rel": Path("b")}
+        a = {"meta": {"title": "T"}, "body": "short", "rel": "a"}
+        b = {"meta": {"title": "T"}, "body": "much longer body text here", "rel": "b"}
         # min by score → b wins because its score has more-negative body length
         assert _entry_score(b) < _entry_score(a)
 
     def test_when_body_tied_longer_title_wins(self):
-        a = {"meta": {"title": "T"}, "body": "x", "rel": Path("a")}
-        b = {"meta": {"title": "Longer"}, "body": "x", "rel": Path("b")}
+        a = {"meta": {"title": "T"}, "body": "x", "rel": "a"}
+        b = {"meta": {"title": "Longer"}, "body": "x", "rel": "b"}
         assert _entry_score(b) < _entry_score(a)
 
     def test_naive_created_normalized_to_utc(self):
@@ -215,7 +251,7 @@ class TestEntryScore:
         e = {
             "meta": {"title": "T", "created": "2024-01-15T10:00:00"},
             "body": "x",
-            "rel": Path("a"),
+            "rel": "a",
         }
         score = _entry_score(e)
         expected = datetime(2024, 1, 15, 10, 0, 0, tzinfo=timezone.utc).timestamp()
@@ -225,18 +261,18 @@ class TestEntryScore:
         e = {
             "meta": {"title": "T", "modified": "2024-06-01T00:00:00+00:00"},
             "body": "x",
-            "rel": Path("a"),
+            "rel": "a",
         }
         expected = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
         assert _entry_score(e)[2] == expected
 
     def test_no_dates_uses_inf(self):
-        e = {"meta": {"title": "T"}, "body": "x", "rel": Path("a")}
+        e = {"meta": {"title": "T"}, "body": "x", "rel": "a"}
         assert _entry_score(e)[2] == float("inf")
 
     def test_rel_is_final_tiebreaker(self):
-        a = {"meta": {"title": "T"}, "body": "x", "rel": Path("a")}
-        b = {"meta": {"title": "T"}, "body": "x", "rel": Path("b")}
+        a = {"meta": {"title": "T"}, "body": "x", "rel": "a"}
+        b = {"meta": {"title": "T"}, "body": "x", "rel": "b"}
         # Same body, title, and date → tiebreaker is the rel string.
         assert _entry_score(a) < _entry_score(b)
         assert _entry_score(a)[3] == "a"
@@ -282,6 +318,17 @@ class TestMakeSearchPredicate:
         assert pred("") is True
         assert pred("anything") is True
 
+    def test_substring_redundant_terms(self):
+        # "py" is implied by "python"; duplicates collapse.
+        pred = _make_search_predicate("py python PY", use_regex=False)
+        assert pred("python") is True
+        assert pred("py") is False
+
+    def test_substring_single_term(self):
+        pred = _make_search_predicate("web", use_regex=False)
+        assert pred("the web") is True
+        assert pred("the net") is False
+
     def test_regex_case_insensitive(self):
         pred = _make_search_predicate(r"^Python", use_regex=True)
         assert pred("python rocks") is True
@@ -290,3 +337,118 @@ class TestMakeSearchPredicate:
     def test_invalid_regex_dies(self):
         with pytest.raises(SystemExit):
             _make_search_predicate("(unbalanced", use_regex=True)
+
+
+class TestIsEmptyDir:
+    def test_empty_and_nonempty(self, tmp_path):
+        assert _is_empty_dir(tmp_path) is True
+        (tmp_path / "f").write_text("", encoding="utf-8")
+        assert _is_empty_dir(tmp_path) is False
+
+    def test_missing_is_not_empty(self, tmp_path):
+        assert _is_empty_dir(tmp_path / "missing") is False
+
+
+class TestBuildNetscapeTree:
+    def test_escapes_title_and_url(self):
+        html = "".join(
+            _build_netscape_tree([("x", {"url": 'https://e.com/?a=1&b="2"', "title": "<A> & B"})])
+        )
+        assert 'HREF="https://e.com/?a=1&amp;b=&quot;2&quot;"' in html
+        assert ">&lt;A&gt; &amp; B</A>" in html
+
+    def test_title_falls_back_to_url(self):
+        html = "".join(_build_netscape_tree([("x", {"url": "https://e.com/?a&b"})]))
+        assert ">https://e.com/?a&amp;b</A>" in html
+
+    def test_nested_folders_sorted_after_bookmarks(self):
+        chunks = _build_netscape_tree(
+            [
+                ("b/y", {"url": "https://y.com"}),
+                ("a/x", {"url": "https://x.com"}),
+                ("z", {"title": "z"}),
+            ]
+        )
+        html = "".join(chunks)
+        assert html.index(">z</A>") < html.index("<H3>a</H3>") < html.index("<H3>b</H3>")
+        assert html.count("<DL><p>") == html.count("</DL><p>") == 2
+
+
+class TestParseNetscapeFile:
+    @pytest.fixture
+    def parse(self, tmp_path, monkeypatch):
+        """Parse `text` from a file in 7-character chunks, so tags straddle reads."""
+        import bm.commands as cmds
+
+        monkeypatch.setattr(cmds, "_IMPORT_CHUNK", 7)
+        fpath = tmp_path / "bookmarks.html"
+
+        def _parse(text):
+            fpath.write_text(text, encoding="utf-8")
+            return _parse_netscape_file(fpath)
+
+        return _parse
+
+    def test_nested_folders_and_dl_close(self, parse):
+        text = (
+            "<DL><p>\n<DT><H3>a</H3>\n<DL><p>\n<DT><H3>b</H3>\n<DL><p>\n"
+            '<DT><A HREF="https://x.com">X</A>\n</DL><p>\n'
+            '<DT><A HREF="https://y.com">Y</A>\n</DL><p>\n'
+            '<DT><A HREF="https://z.com">Z</A>\n</DL><p>\n'
+        )
+        paths = [(p, m["url"]) for p, m in parse(text)]
+        assert paths == [("a/b", "https://x.com"), ("a", "https://y.com"), ("", "https://z.com")]
+
+    def test_entities_decoded_in_href_and_folder(self, parse):
+        text = (
+            "<DT><H3>R&amp;D</H3>\n<DL><p>\n"
+            '<DT><A HREF="https://x.com/?a=1&amp;b=2">T</A>\n</DL><p>\n'
+        )
+        [(path, meta)] = parse(text)
+        assert path == "R&D"
+        assert meta["url"] == "https://x.com/?a=1&b=2"
+
+    def test_markup_inside_title_dropped(self, parse):
+        [(_, meta)] = parse('<DT><A HREF="https://x.com"><b>Bold</b> text</A>')
+        assert meta["title"] == "Bold text"
+
+    def test_single_quoted_and_lowercase_attrs(self, parse):
+        [(_, meta)] = parse("<dt><a href='https://x.com' tags='a,b'>T</a>")
+        assert meta["url"] == "https://x.com"
+        assert meta["tags"] == ["a", "b"]
+
+    def test_undated_links_share_one_timestamp(self, parse, monkeypatch):
+        import bm.commands as cmds
+
+        stamps = iter(["2024-01-01T00:00:00+00:00", "2099-01-01T00:00:00+00:00"])
+        monkeypatch.setattr(cmds, "iso_now", lambda: next(stamps))
+        text = '<A HREF="https://x.com" TAGS=" a, ,b ">X</A><A HREF="https://y.com">Y</A>'
+        entries = parse(text)
+        assert [m["created"] for _, m in entries] == ["2024-01-01T00:00:00+00:00"] * 2
+        assert entries[0][1]["tags"] == ["a", "b"]
+
+    def test_file_parsed_across_chunk_boundaries(self, parse, monkeypatch):
+        import bm.commands as cmds
+
+        monkeypatch.setattr(cmds, "iso_now", lambda: "2024-01-01T00:00:00+00:00")
+        text = (
+            "<DL><p>\n<DT><H3>R&amp;D</H3>\n<DL><p>\n"
+            '<DT><A HREF="https://x.com/?a=1&amp;b=2" TAGS="a,b">Caf\u00e9 &lt;1&gt;</A>\n'
+            "</DL><p>\n</DL><p>\n"
+        )
+        [(path, meta)] = parse(text)
+        assert (path, meta["title"]) == ("R&D", "Caf\u00e9 <1>")
+        assert meta["url"] == "https://x.com/?a=1&b=2"
+        assert meta["tags"] == ["a", "b"]
+        assert meta["created"] == "2024-01-01T00:00:00+00:00"
+
+    def test_anchor_without_href_ignored(self, parse):
+        assert parse('<DT><A NAME="x">nothing</A>') == []
+
+    def test_non_numeric_add_date_keeps_default(self, parse):
+        [(_, meta)] = parse('<DT><A HREF="https://x.com" ADD_DATE="soon">T</A>')
+        assert meta["created"]
+
+    def test_unclosed_anchor_flushed_on_close(self, parse):
+        [(_, meta)] = parse('<DT><A HREF="https://x.com">Trailing')
+        assert meta["title"] == "Trailing"
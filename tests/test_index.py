@@ -0,0 +1,217 @@
+"""Unit tests for bm.index module."""
+
+import json
+import os
+import time
+
+import pytest
+
+from bm.index import cache_dir, find_by_id, index_path, iter_index, load_index, save_index
+
+
+@pytest.fixture
+def kiritimati_tz():
+    """Run with local time at UTC+14, restoring the previous TZ afterwards."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("needs time.tzset")
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "Pacific/Kiritimati"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+class TestCacheDir:
+    """Test cache_dir / index_path."""
+
+    def test_env_override(self, tmp_path, monkeypatch):
+        """BM_CACHE_DIR should win over XDG_CACHE_HOME."""
+        monkeypatch.setenv("BM_CACHE_DIR", str(tmp_path / "c"))
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        assert cache_dir() == tmp_path / "c"
+
+    def test_xdg_fallback(self, tmp_path, monkeypatch):
+        """Without BM_CACHE_DIR the XDG cache home is used."""
+        monkeypatch.delenv("BM_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        assert cache_dir() == tmp_path / "xdg" / "bm"
+
+    def test_index_path_is_per_store(self, tmp_path):
+        """Different stores should map to different index files."""
+        a = tmp_path / "a"
+        b = tmp_path / "b"
+        assert index_path(a) != index_path(b)
+        assert index_path(a).parent == cache_dir()
+
+
+class TestIterIndex:
+    """Test iter_index caching behavior."""
+
+    def test_yields_entries(self, store, write_bm):
+        """Should yield every bookmark with parsed front matter."""
+        write_bm("dev/a", url="https://a.com", title="A", tags=["x"])
+        write_bm("b", url="https://b.com")
+        entries = {e.rel: e for e in iter_index(store)}
+        assert set(entries) == {"dev/a", "b"}
+        assert entries["dev/a"].meta["title"] == "A"
+        assert entries["dev/a"].meta["tags"] == ["x"]
+        assert entries["dev/a"].path == str(store / "dev" / "a.bm")
+
+    def test_malformed_url_has_no_host(self, store, write_bm):
+        """A URL urlparse rejects should not abort the walk for the whole store."""
+        write_bm("bad", url="http://[oops")
+        write_bm("good", url="https://good.com")
+        entries = {e.rel: e for e in iter_index(store)}
+        assert set(entries) == {"bad", "good"}
+        assert entries["bad"].host == ""
+        assert entries["good"].host == "good.com"
+
+    @pytest.mark.parametrize(
+        "created", ["0001-01-01T00:00:00", "9999-12-31T23:59:59"], ids=["year-1", "year-9999"]
+    )
+    def test_out_of_range_created_is_undated(self, store, kiritimati_tz, created):
+        """Naive edge-of-calendar timestamps that overflow locally should sort as undated."""
+        (store / "edge.bm").write_text(
+            f"---\nurl: https://e.com\ncreated: {created}\n---\n", encoding="utf-8"
+        )
+        [entry] = list(iter_index(store))
+        assert entry.ts is None
+
+    def test_persists_records(self, store, write_bm):
+        """A completed walk should write the index."""
+        write_bm("a", url="https://a.com")
+        list(iter_index(store))
+        records = load_index(store)
+        assert records["a"]["meta"]["url"] == "https://a.com"
+
+    def test_unchanged_files_are_not_reparsed(self, store, write_bm, monkeypatch):
+        """Second walk should reuse cached meta without touching load_entry."""
+        write_bm("a", url="https://a.com")
+        list(iter_index(store))
+
+        import bm.index as index_mod
+
+        def boom(*a, **k):
+            raise AssertionError("load_entry should not be called")
+
+        monkeypatch.setattr(index_mod, "load_entry", boom)
+        [entry] = list(iter_index(store))
+        assert entry.meta["url"] == "https://a.com"
+
+    def test_modified_file_is_reparsed(self, store, write_bm):
+        """Changing a file should refresh its record."""
+        write_bm("a", url="https://a.com", title="Old")
+        list(iter_index(store))
+        write_bm("a", url="https://a.com", title="Newer title")
+        [entry] = list(iter_index(store))
+        assert entry.meta["title"] == "Newer title"
+
+    def test_removed_file_is_dropped(self, store, write_bm):
+        """Deleted bookmarks should disappear from the index."""
+        write_bm("a", url="https://a.com")
+        p = write_bm("b", url="https://b.com")
+        list(iter_index(store))
+        p.unlink()
+        assert [e.rel for e in iter_index(store)] == ["a"]
+        assert set(load_index(store)) == {"a"}
+
+    def test_corrupt_index_is_ignored(self, store, write_bm):
+        """A garbage index file should be treated as empty, then rebuilt."""
+        write_bm("a", url="https://a.com")
+        path = index_path(store)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{not json", encoding="utf-8")
+        [entry] = list(iter_index(store))
+        assert entry.meta["url"] == "https://a.com"
+        assert json.loads(path.read_text(encoding="utf-8"))["entries"]["a"]
+
+    def test_malformed_record_is_reparsed(self, store, write_bm):
+        """Records with the wrong shape should not be trusted."""
+        write_bm("a", url="https://a.com")
+        save_index(store, {"a": {"sig": "bogus", "meta": []}})
+        [entry] = list(iter_index(store))
+        assert entry.meta["url"] == "https://a.com"
+
+    def test_unwritable_cache_is_tolerated(self, store, write_bm, tmp_path, monkeypatch):
+        """Failure to save the index must not break iteration."""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("", encoding="utf-8")
+        monkeypatch.setenv("BM_CACHE_DIR", str(blocker / "sub"))
+        write_bm("a", url="https://a.com")
+        assert len(list(iter_index(store))) == 1
+
+    def test_many_stale_files_parse_in_bulk(self, store, write_bm):
+        """Large cold scans (thread-pool path) should still yield every entry."""
+        for i in range(50):
+            write_bm(f"d{i % 5}/e{i}", url=f"https://e{i}.com")
+        entries = {e.rel: e.meta["url"] for e in iter_index(store)}
+        assert len(entries) == 50
+        assert entries["d3/e13"] == "https://e13.com"
+
+    def test_host_precomputed(self, store, write_bm):
+        """Entries and records should carry the normalized URL host."""
+        write_bm("a", url="https://WWW.Example.com/x")
+        [entry] = list(iter_index(store))
+        assert entry.host == "example.com"
+        assert load_index(store)["a"]["host"] == "example.com"
+
+    def test_id_precomputed(self, store, write_bm):
+        """Entries and records should carry the URL-derived ID."""
+        from bm.utils import rid
+
+        write_bm("a", url="https://example.com/x")
+        [entry] = list(iter_index(store))
+        assert entry.id == rid("https://example.com/x")
+        assert load_index(store)["a"]["id"] == entry.id
+
+    def test_record_without_id_is_reparsed(self, store, write_bm):
+        """Records written before IDs were cached should be refreshed."""
+        write_bm("a", url="https://a.com")
+        list(iter_index(store))
+        records = load_index(store)
+        del records["a"]["id"]
+        save_index(store, records)
+        [entry] = list(iter_index(store))
+        assert entry.id
+        assert "id" in load_index(store)["a"]
+
+
+class TestFindById:
+    """Test find_by_id lookups against the cached index."""
+
+    def test_hit_without_walk(self, store, write_bm, monkeypatch):
+        """A fresh record should resolve without walking the store."""
+        import bm.index as index_mod
+        from bm.utils import rid
+
+        p = write_bm("dev/a", url="https://a.com")
+        list(iter_index(store))
+
+        def boom(*a, **k):
+            raise AssertionError("walk_store should not be called")
+
+        monkeypatch.setattr(index_mod, "walk_store", boom)
+        assert find_by_id(store, rid("https://a.com")) == p
+
+    def test_stale_record_is_not_trusted(self, store, write_bm):
+        """A file changed since indexing should not be returned from the cache."""
+        from bm.utils import rid
+
+        write_bm("a", url="https://a.com")
+        list(iter_index(store))
+        write_bm("a", url="https://b.com", title="changed")
+        assert find_by_id(store, rid("https://a.com")) is None
+
+    def test_missing_file_and_unknown_id(self, store, write_bm):
+        """Deleted files and unknown IDs should miss."""
+        from bm.utils import rid
+
+        p = write_bm("a", url="https://a.com")
+        list(iter_index(store))
+        assert find_by_id(store, "0" * 12) is None
+        p.unlink()
+        assert find_by_id(store, rid("https://a.com")) is None
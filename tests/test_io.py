@@ -7,8 +7,13 @@ from bm.io import (
     _normalize_meta,
     atomic_write,
     build_text,
+    load_body,
     load_entry,
+    map_io,
     parse_front_matter,
+    split_body,
+    walk_store,
+    write_new,
 )
 
 
@@ -118,6 +123,17 @@ tags: [tag1, "tag,with,comma", tag3]
         meta, body = parse_front_matter(text)
         assert meta["tags"] == ["tag1", "tag,with,comma", "tag3"]
 
+    def test_tags_array_unquoted_drops_blanks(self):
+        """Unquoted arrays should split on commas and drop empty items."""
+        meta, _ = parse_front_matter("---\ntags: [ a , , b,]\n---\n")
+        assert meta["tags"] == ["a", "b"]
+
+    def test_tags_interned(self):
+        """Equal tags from different entries should share one string object."""
+        a, _ = parse_front_matter("---\ntags: [py" + "thon]\n---\n")
+        b, _ = parse_front_matter("---\ntags: python, x\n---\n")
+        assert a["tags"][0] is b["tags"][0]
+
     def test_comments(self):
         """Should ignore comments in front matter."""
         text = """---
@@ -376,3 +392,153 @@ class TestAtomicWrite:
         with pytest.raises(OSError):
             atomic_write(fpath, "v2")
         assert fpath.read_text() == "v1"
+
+
+class TestWalkStore:
+    """Test walk_store function."""
+
+    def test_yields_rel_without_extension(self, tmp_path):
+        """Should yield '/'-joined relative paths for nested bookmarks."""
+        (tmp_path / "dev" / "py").mkdir(parents=True)
+        (tmp_path / "dev" / "py" / "a.bm").write_text("x")
+        (tmp_path / "b.bm").write_text("x")
+        (tmp_path / "notes.txt").write_text("x")
+        found = sorted(rel for _, rel in walk_store(tmp_path))
+        assert found == ["b", "dev/py/a"]
+
+    def test_skips_git_dir(self, tmp_path):
+        """Should not descend into .git."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "x.bm").write_text("x")
+        assert list(walk_store(tmp_path)) == []
+
+    def test_missing_store_yields_nothing(self, tmp_path):
+        """A nonexistent store should be treated as empty."""
+        assert list(walk_store(tmp_path / "nope")) == []
+
+    def test_does_not_follow_symlinked_dirs(self, tmp_path):
+        """Symlinked directories should not be traversed."""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "x.bm").write_text("x")
+        store = tmp_path / "store"
+        store.mkdir()
+        try:
+            (store / "link").symlink_to(outside, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("symlinks unsupported")
+        assert list(walk_store(store)) == []
+
+
+class TestReadMetaOnly:
+    """Test the partial reader behind load_entry(meta_only=True)."""
+
+    def test_stops_at_closing_marker_across_chunks(self, tmp_path):
+        """A header spanning several chunks should still be cut at the close."""
+        from bm.io import _read_meta_only
+
+        notes = "n" * (8192 * 2)
+        fpath = tmp_path / "x.bm"
+        fpath.write_text(f"---\nurl: https://e.com\nnotes: {notes}\n---\nbody\n", encoding="utf-8")
+        text = _read_meta_only(fpath)
+        assert text.endswith("---\n")
+        assert "body" not in text
+
+    def test_no_front_matter_reads_first_line_only(self, tmp_path):
+        """Files without front matter only need their first line."""
+        from bm.io import _read_meta_only
+
+        fpath = tmp_path / "x.bm"
+        fpath.write_text("https://e.com\n" + "x" * (8192 * 2), encoding="utf-8")
+        assert _read_meta_only(fpath) == "https://e.com\n"
+
+    def test_unterminated_front_matter_reads_everything(self, tmp_path):
+        """Without a closing marker the whole file is returned."""
+        from bm.io import _read_meta_only
+
+        content = "---\nurl: https://e.com\n" + "x" * (8192 * 2)
+        fpath = tmp_path / "x.bm"
+        fpath.write_text(content, encoding="utf-8")
+        assert _read_meta_only(fpath) == content
+
+    def test_delimiter_split_across_chunks(self, tmp_path):
+        """A closing marker straddling a chunk boundary should still be found."""
+        from bm.io import _read_meta_only
+
+        head = "---\nnotes: "
+        pad = "n" * (8192 - len(head) - 2)
+        fpath = tmp_path / "x.bm"
+        fpath.write_text(f"{head}{pad}\n---\nbody\n", encoding="utf-8")
+        assert _read_meta_only(fpath) == f"{head}{pad}\n---\n"
+
+    def test_crlf_front_matter_matches_full_read(self, tmp_path):
+        """CRLF files should parse to the same meta as a full text-mode read."""
+        from bm.io import _read_meta_only, load_entry
+
+        fpath = tmp_path / "x.bm"
+        fpath.write_bytes(b"---\r\nurl: https://e.com\r\ntags: [a, b]\r\n---\r\nbody\r\n")
+        assert _read_meta_only(fpath) == "---\nurl: https://e.com\ntags: [a, b]\n---\n"
+        assert load_entry(fpath, meta_only=True)[0] == load_entry(fpath)[0]
+
+
+class TestSplitBody:
+    """Test split_body / load_body against the full parser."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "---\nurl: https://e.com\ntags: [a]\n---\n\nbody\n",
+            "---\nurl: https://e.com\n---\n",
+            "---\nurl: https://e.com\nno close\n",
+            "https://e.com\n\nplain body\r\nline\n",
+            "just text\n",
+            "",
+        ],
+    )
+    def test_matches_parse_front_matter(self, text):
+        """Body should be identical to what parse_front_matter returns."""
+        assert split_body(text) == parse_front_matter(text)[1]
+
+    def test_load_body(self, tmp_path):
+        """load_body should read the file and return its body."""
+        fpath = tmp_path / "x.bm"
+        fpath.write_text("---\nurl: https://e.com\n---\nhello\n", encoding="utf-8")
+        assert load_body(fpath) == "hello\n"
+
+
+class TestMapIo:
+    """Test map_io function."""
+
+    def test_small_batch_preserves_order(self):
+        """Inline path should return results in input order."""
+        assert map_io(lambda x: x * 2, [1, 2, 3]) == [2, 4, 6]
+
+    def test_large_batch_preserves_order(self):
+        """Thread-pool path should also return results in input order."""
+        items = list(range(200))
+        assert map_io(lambda x: x + 1, items) == [x + 1 for x in items]
+
+
+class TestWriteNew:
+    """Test write_new function."""
+
+    def test_creates_file(self, tmp_path):
+        """Should create the file with the given content."""
+        fpath = tmp_path / "x.bm"
+        write_new(fpath, "hello\n")
+        assert fpath.read_text(encoding="utf-8") == "hello\n"
+
+    def test_refuses_existing_file_and_symlink(self, tmp_path):
+        """Should never overwrite a file or follow a symlink."""
+        fpath = tmp_path / "x.bm"
+        fpath.write_text("old", encoding="utf-8")
+        with pytest.raises(FileExistsError):
+            write_new(fpath, "new")
+        assert fpath.read_text(encoding="utf-8") == "old"
+
+        target = tmp_path / "target"
+        link = tmp_path / "link.bm"
+        link.symlink_to(target)
+        with pytest.raises(FileExistsError):
+            write_new(link, "new")
+        assert not target.exists()
@@ -2,9 +2,11 @@
 
 import re
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import pytest
 
+import bm.utils
 from bm.utils import (
     _normalize_netloc_for_compare,
     _normalize_path_for_compare,
@@ -15,28 +17,45 @@ from bm.utils import (
     id_to_path,
     is_relative_to,
     iso_now,
+    meta_epoch,
     normalize_slug,
     normalize_url_for_compare,
     parse_iso,
     rid,
     to_epoch,
+    url_host,
 )
 
+_EXAMPLE_URL = "https://example.com"
+_EXAMPLE_RID = rid(_EXAMPLE_URL)
+_HASH_SUFFIX = re.compile(r"-[0-9a-f]{7}$")
+_FROZEN_NOW = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Pin the epoch `iso_now` reads to `_FROZEN_NOW`."""
+    monkeypatch.setattr(bm.utils, "time", SimpleNamespace(time=_FROZEN_NOW.timestamp))
+
 
 class TestIsoNow:
     """Test iso_now function."""
 
-    def test_returns_string(self):
+    def test_returns_string(self, frozen_clock):
         """Should return a string."""
         result = iso_now()
         assert isinstance(result, str)
 
-    def test_format(self):
+    def test_format(self, frozen_clock):
         """Should be in ISO format with timezone."""
         result = iso_now()
         ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:Z|[+-]\d{2}:\d{2})$")
         assert ISO_RE.match(result)
 
+    def test_frozen_instant(self, frozen_clock):
+        """Should render exactly the clock's instant, whatever the local offset."""
+        assert parse_iso(iso_now()) == _FROZEN_NOW
+
     def test_iso_now_shape_and_parseable(self):
         """Should be parseable and close to now."""
         s = iso_now()
@@ -48,42 +67,69 @@ class TestIsoNow:
 class TestParseIso:
     """Test parse_iso function."""
 
-    def test_none_for_empty(self):
-        """Should return None for empty string."""
-        assert parse_iso("") is None
-        assert parse_iso("   ") is None
+    @pytest.mark.parametrize(
+        "s,expected",
+        [
+            ("", None),
+            ("   ", None),
+            ("2023-01-15", (2023, 1, 15, 0, 0, 0)),
+            ("2023-01-15T10:30:45+05:00", (2023, 1, 15, 10, 30, 45)),
+            ("2023-01-15T10:30:45Z", (2023, 1, 15, 10, 30, 45)),
+            ("invalid", None),
+            ("2023-13-45", None),
+        ],
+        ids=["empty", "blank", "date-only", "full", "z-suffix", "invalid", "bad-date"],
+    )
+    def test_parse_iso(self, s, expected):
+        """Should parse dates and ISO timestamps; None for empty or invalid input."""
+        dt = parse_iso(s)
+        got = None if dt is None else (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+        assert got == expected
+
+    @pytest.mark.parametrize(
+        "s,expected",
+        [
+            ("2024-01-02T03:04:05Z", datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)),
+            (
+                "2024-01-02T03:04:05-05:00",
+                datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5))),
+            ),
+            (
+                "2024-01-02T03:04:05.250+05:30",
+                datetime(
+                    2024, 1, 2, 3, 4, 5, 250000, tzinfo=timezone(timedelta(hours=5, minutes=30))
+                ),
+            ),
+            (
+                "2024-01-02 03:04:05+00:00",
+                datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            ),
+            ("2024-01-02T03:04:05", datetime(2024, 1, 2, 3, 4, 5)),
+        ],
+        ids=["z-suffix", "negative-offset", "fraction", "space-separator", "naive"],
+    )
+    def test_full_timestamps(self, s, expected):
+        """Anything but a bare date goes through the full parser, keeping its offset."""
+        dt = parse_iso(s)
+        assert dt == expected
+        assert dt.utcoffset() == expected.utcoffset()
 
-    def test_date_only(self):
-        """Should parse YYYY-MM-DD as start of day."""
-        dt = parse_iso("2023-01-15")
-        assert dt is not None
-        assert dt.year == 2023
-        assert dt.month == 1
-        assert dt.day == 15
-        assert dt.hour == 0
-        assert dt.minute == 0
-
-    def test_full_iso(self):
-        """Should parse full ISO timestamp."""
-        dt = parse_iso("2023-01-15T10:30:45+05:00")
-        assert dt is not None
-        assert dt.year == 2023
-        assert dt.month == 1
-        assert dt.day == 15
-        assert dt.hour == 10
-        assert dt.minute == 30
-        assert dt.second == 45
-
-    def test_z_suffix(self):
-        """Should handle Z suffix."""
-        dt = parse_iso("2023-01-15T10:30:45Z")
-        assert dt is not None
-        assert dt.year == 2023
+    @pytest.mark.parametrize("s", ["2024-01-02", "  2024-01-02\n"], ids=["bare", "padded"])
+    def test_bare_date_is_local_midnight(self, s):
+        """Bare dates take the fast path: start of that day in local time."""
+        dt = parse_iso(s)
+        assert dt.tzinfo is not None
+        assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == (2024, 1, 2, 0, 0, 0)
+        assert dt.utcoffset() == datetime(2024, 1, 2).astimezone().utcoffset()
 
-    def test_invalid(self):
-        """Should return None for invalid formats."""
-        assert parse_iso("invalid") is None
-        assert parse_iso("2023-13-45") is None
+    @pytest.mark.parametrize(
+        "s",
+        ["2024-01-02x", "12024-01-02", "2024-01-02T", "2024/01/02", "2024-01-02T25:00:00"],
+        ids=["suffix", "five-digit-year", "dangling-t", "slashes", "bad-hour"],
+    )
+    def test_near_miss_dates_rejected(self, s):
+        """Inputs the bare-date fast path rejects must not parse via the fallback either."""
+        assert parse_iso(s) is None
 
 
 class TestToEpoch:
@@ -108,53 +154,33 @@ class TestToEpoch:
 class TestNormalizeSlug:
     """Test normalize_slug function."""
 
-    def test_basic(self):
-        """Should normalize basic strings."""
-        assert normalize_slug("hello world") == "hello-world"
-        assert normalize_slug("Hello/World") == "hello/world"
-
-    def test_special_chars(self):
-        """Should remove special characters."""
-        assert normalize_slug("hello@world!") == "helloworld"
-
-    def test_multiple_dashes(self):
-        """Should collapse multiple dashes."""
-        assert normalize_slug("hello--world") == "hello-world"
-
-    def test_strip_slashes(self):
-        """Should strip leading/trailing slashes."""
-        assert normalize_slug("/hello/world/") == "hello/world"
-
-    def test_empty(self):
-        """Should return 'untitled' for empty string."""
-        assert normalize_slug("") == "untitled"
-        assert normalize_slug("   ") == "untitled"
-
-    def test_trim_leading_trailing_slashes(self):
-        """Should trim leading and trailing slashes."""
-        assert normalize_slug("/hello/world/") == "hello/world"
-        assert normalize_slug("///hello///") == "hello"
-
-    def test_reject_dot_dot(self):
-        """Should reject paths with .."""
-        with pytest.raises(SystemExit):
-            _reject_unsafe("../escape")
-
-    def test_reject_absolute_path(self):
-        """Should reject absolute paths."""
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("hello world", "hello-world"),
+            ("Hello/World", "hello/world"),
+            ("hello@world!", "helloworld"),
+            ("hello--world", "hello-world"),
+            ("/hello/world/", "hello/world"),
+            ("///hello///", "hello"),
+            ("", "untitled"),
+            ("   ", "untitled"),
+        ],
+        ids=["space", "case", "special", "dashes", "slashes", "slash-runs", "empty", "blank"],
+    )
+    def test_normalize(self, raw, expected):
+        """Should lowercase, drop special chars, collapse dashes and trim slashes."""
+        assert normalize_slug(raw) == expected
+
+    @pytest.mark.parametrize(
+        "raw",
+        ["../escape", "/absolute/path", "...", "....", "a/.../b", "a/b\x00c"],
+        ids=["dot-dot", "absolute", "three-dots", "four-dots", "dots-segment", "nul-byte"],
+    )
+    def test_reject_unsafe(self, raw):
+        """Should reject `..`, absolute paths, all-dot segments and NUL bytes."""
         with pytest.raises(SystemExit):
-            _reject_unsafe("/absolute/path")
-
-    def test_reject_all_dots_segment(self):
-        """Should reject any segment that is entirely dots."""
-        for s in ["...", "....", "a/.../b"]:
-            with pytest.raises(SystemExit):
-                _reject_unsafe(s)
-
-    def test_reject_null_byte(self):
-        """Should reject NUL byte in any segment."""
-        with pytest.raises(SystemExit):
-            _reject_unsafe("a/b\x00c")
+            _reject_unsafe(raw)
 
     def test_accept_leading_dot_segment(self):
         """Single-dot prefix segments (e.g. .git) are accepted."""
@@ -347,6 +373,18 @@ class TestIdToPath:
         result = id_to_path(tmp_path, "test-slug")
         assert str(result) == str(tmp_path / "test-slug.bm")
 
+    def test_presolved_store(self, tmp_path):
+        """A pre-resolved store should give the same path and still block escapes."""
+        store = tmp_path / "store"
+        store.mkdir()
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (store / "link").symlink_to(outside)
+        real = store.resolve()
+        assert id_to_path(store, "a/b", real) == id_to_path(store, "a/b")
+        with pytest.raises(SystemExit):
+            id_to_path(store, "link/x", real)
+
 
 class TestCreateSlugFromUrl:
     """Test create_slug_from_url function."""
@@ -355,13 +393,18 @@ class TestCreateSlugFromUrl:
         """Should create slug from URL."""
         slug = create_slug_from_url("https://example.com/path")
         assert "example-com" in slug
-        assert re.search(r"-[0-9a-f]{7}$", slug)
+        assert _HASH_SUFFIX.search(slug) is not None
+
+    def test_known_value(self):
+        """Slugs must not change across releases, or re-imports duplicate files."""
+        assert create_slug_from_url("https://example.com/path") == "example-com-path-abc4f9e"
 
     def test_no_path(self):
         """Should handle URL without path."""
         slug = create_slug_from_url("https://example.com")
         assert slug.startswith("example-com-")
         assert "xxxx" not in slug
+        assert _HASH_SUFFIX.search(slug) is not None
 
     def test_url_with_path(self):
         """Should include the final path segment in slug."""
@@ -457,20 +500,56 @@ class TestRid:
 
     def test_consistent(self):
         """Should return consistent hash for same URL."""
-        url = "https://example.com"
-        rid1 = rid(url)
-        rid2 = rid(url)
-        assert rid1 == rid2
-        assert len(rid1) == 12  # 6 bytes * 2 hex chars
+        assert rid(_EXAMPLE_URL) == _EXAMPLE_RID
+        assert len(_EXAMPLE_RID) == 12  # 6 bytes * 2 hex chars
 
     def test_different_urls(self):
         """Should return different hashes for different URLs."""
-        rid1 = rid("https://example.com")
-        rid2 = rid("https://example.org")
-        assert rid1 != rid2
+        assert _EXAMPLE_RID != rid("https://example.org")
 
     def test_rid_shape_and_hex(self):
         """Should be 12 hex chars."""
-        h = rid("https://example.com")
-        assert len(h) == 12
-        assert re.fullmatch(r"[0-9a-f]{12}", h)
+        assert len(_EXAMPLE_RID) == 12
+        assert re.fullmatch(r"[0-9a-f]{12}", _EXAMPLE_RID)
+
+    def test_known_value(self):
+        """IDs must not change across releases (BLAKE2b, 6-byte digest)."""
+        assert _EXAMPLE_RID == "625994737d12"
+
+
+class TestUrlHost:
+    """Test url_host function."""
+
+    def test_strips_leading_www(self):
+        """Should drop a leading www. label."""
+        assert url_host("https://www.example.com/x") == "example.com"
+
+    def test_lowercases(self):
+        """Should lowercase the host."""
+        assert url_host("https://EXAMPLE.com") == "example.com"
+
+    def test_keeps_port(self):
+        """Should keep a port, like the netloc it comes from."""
+        assert url_host("http://example.com:8080/") == "example.com:8080"
+
+    def test_empty_url(self):
+        """Should return empty string for an empty URL."""
+        assert url_host("") == ""
+
+
+class TestMetaEpoch:
+    """Test meta_epoch function."""
+
+    def test_prefers_created(self):
+        """Should use created when present."""
+        meta = {"created": "2024-01-01T00:00:00+00:00", "modified": "2025-01-01T00:00:00+00:00"}
+        assert meta_epoch(meta) == int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+    def test_falls_back_to_modified(self):
+        """Should use modified when created is missing or invalid."""
+        meta = {"created": "garbage", "modified": "2024-06-01T00:00:00+00:00"}
+        assert meta_epoch(meta) == int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp())
+
+    def test_no_dates(self):
+        """Should return None without usable timestamps."""
+        assert meta_epoch({}) is None